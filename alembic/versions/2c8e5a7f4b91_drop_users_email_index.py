@@ -0,0 +1,28 @@
+"""Drop users email index
+
+Revision ID: 2c8e5a7f4b91
+Revises: 6a1f3d8c2e57
+Create Date: 2026-10-14 18:05:27.390162
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8e5a7f4b91'
+down_revision: Union[str, Sequence[str], None] = '6a1f3d8c2e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
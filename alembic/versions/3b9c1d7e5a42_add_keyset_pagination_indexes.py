@@ -0,0 +1,30 @@
+"""Add keyset pagination indexes
+
+Revision ID: 3b9c1d7e5a42
+Revises: f2f0703b107b
+Create Date: 2026-10-14 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9c1d7e5a42'
+down_revision: Union[str, Sequence[str], None] = 'f2f0703b107b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_orders_user_id_id', 'orders', ['user_id', 'id'], unique=False)
+    op.create_index('ix_products_status_id', 'products', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_status_id', table_name='products')
+    op.drop_index('ix_orders_user_id_id', table_name='orders')
@@ -0,0 +1,28 @@
+"""Add product name prefix index
+
+Revision ID: 4f7a9c1e3b68
+Revises: 2c8e5a7f4b91
+Create Date: 2026-10-14 18:41:09.552813
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f7a9c1e3b68'
+down_revision: Union[str, Sequence[str], None] = '2c8e5a7f4b91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_name_lower_pattern', 'products', [sa.text('lower(name) text_pattern_ops')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_name_lower_pattern', table_name='products')
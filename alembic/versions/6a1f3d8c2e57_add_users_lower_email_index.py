@@ -0,0 +1,28 @@
+"""Add users lower(email) index
+
+Revision ID: 6a1f3d8c2e57
+Revises: 9e4b7c2a5d18
+Create Date: 2026-10-14 17:32:44.618027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a1f3d8c2e57'
+down_revision: Union[str, Sequence[str], None] = '9e4b7c2a5d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_email_lower', table_name='users')
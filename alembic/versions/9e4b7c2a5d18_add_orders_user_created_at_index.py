@@ -0,0 +1,28 @@
+"""Add orders user_id, created_at index
+
+Revision ID: 9e4b7c2a5d18
+Revises: f8c2d4b6a193
+Create Date: 2026-10-14 16:48:05.217394
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b7c2a5d18'
+down_revision: Union[str, Sequence[str], None] = 'f8c2d4b6a193'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
@@ -0,0 +1,32 @@
+"""Replace payment single column indexes
+
+Revision ID: a4d2c8e6f917
+Revises: e1f6b8a3c705
+Create Date: 2026-10-14 15:31:47.215093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d2c8e6f917'
+down_revision: Union[str, Sequence[str], None] = 'e1f6b8a3c705'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(op.f('ix_payments_provider'), table_name='payments')
+    op.drop_index(op.f('ix_payments_order_id'), table_name='payments')
+    op.create_index('ix_payments_order_id_status', 'payments', ['order_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payments_order_id_status', table_name='payments')
+    op.create_index(op.f('ix_payments_order_id'), 'payments', ['order_id'], unique=False)
+    op.create_index(op.f('ix_payments_provider'), 'payments', ['provider'], unique=False)
@@ -0,0 +1,34 @@
+"""Shrink payment transaction_id
+
+Revision ID: b7e3f9a1d428
+Revises: a4d2c8e6f917
+Create Date: 2026-10-14 15:52:06.384721
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f9a1d428'
+down_revision: Union[str, Sequence[str], None] = 'a4d2c8e6f917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('payments', 'transaction_id',
+               existing_type=sa.VARCHAR(length=255),
+               type_=sa.String(length=64),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('payments', 'transaction_id',
+               existing_type=sa.String(length=64),
+               type_=sa.VARCHAR(length=255),
+               existing_nullable=False)
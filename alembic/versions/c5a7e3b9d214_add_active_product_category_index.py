@@ -0,0 +1,28 @@
+"""Add active product category index
+
+Revision ID: c5a7e3b9d214
+Revises: 8d4e2a6f1c93
+Create Date: 2026-10-14 15:09:52.640187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a7e3b9d214'
+down_revision: Union[str, Sequence[str], None] = '8d4e2a6f1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_active_category_id', 'products', ['category_id', 'id'], unique=False, postgresql_where=sa.text("status = 'ACTIVE'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_active_category_id', table_name='products', postgresql_where=sa.text("status = 'ACTIVE'"))
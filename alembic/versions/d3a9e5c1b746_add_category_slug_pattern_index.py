@@ -0,0 +1,28 @@
+"""Add category slug pattern index
+
+Revision ID: d3a9e5c1b746
+Revises: b7e3f9a1d428
+Create Date: 2026-10-14 16:03:41.572918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9e5c1b746'
+down_revision: Union[str, Sequence[str], None] = 'b7e3f9a1d428'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_categories_slug_pattern', 'categories', ['slug'], unique=False, postgresql_ops={'slug': 'varchar_pattern_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_categories_slug_pattern', table_name='categories', postgresql_ops={'slug': 'varchar_pattern_ops'})
@@ -0,0 +1,37 @@
+"""Store payment raw_response as JSONB
+
+Revision ID: e1f6b8a3c705
+Revises: c5a7e3b9d214
+Create Date: 2026-10-14 15:14:08.927361
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f6b8a3c705'
+down_revision: Union[str, Sequence[str], None] = 'c5a7e3b9d214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('payments', 'raw_response',
+               existing_type=sa.JSON(),
+               type_=postgresql.JSONB(),
+               existing_nullable=True,
+               postgresql_using='raw_response::jsonb')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('payments', 'raw_response',
+               existing_type=postgresql.JSONB(),
+               type_=sa.JSON(),
+               existing_nullable=True,
+               postgresql_using='raw_response::json')
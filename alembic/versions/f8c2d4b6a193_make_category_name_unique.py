@@ -0,0 +1,30 @@
+"""Make category name unique
+
+Revision ID: f8c2d4b6a193
+Revises: d3a9e5c1b746
+Create Date: 2026-10-14 16:21:18.903456
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8c2d4b6a193'
+down_revision: Union[str, Sequence[str], None] = 'd3a9e5c1b746'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(op.f('ix_categories_name'), table_name='categories')
+    op.create_index(op.f('ix_categories_name'), 'categories', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_categories_name'), table_name='categories')
+    op.create_index(op.f('ix_categories_name'), 'categories', ['name'], unique=False)
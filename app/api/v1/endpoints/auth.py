@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.database import get_db
@@ -26,6 +26,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 def login(
     login_data: UserLogin,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
@@ -37,7 +38,8 @@ def login(
     user_service = UserService(db)
     
     # Authenticate user
-    user = user_service.authenticate_user(login_data.email, login_data.password)
+    client_ip = request.client.host if request.client else None
+    user = user_service.authenticate_user(login_data.email, login_data.password, client_ip)
     
     if not user:
         raise HTTPException(
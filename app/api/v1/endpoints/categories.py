@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
@@ -6,6 +6,7 @@ from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryRespons
 from app.services.category_service import CategoryService
 from app.core.dependencies import get_current_admin_user
 from app.models.user import User
+from app.utils.responses import raw_json_response
 
 router = APIRouter()
 
@@ -38,14 +39,15 @@ def get_all_categories(
 
 @router.get("/tree", response_model=List[CategoryTreeResponse])
 def get_category_tree(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
     Get category tree (nested structure)
     """
-    category_service = CategoryService(db)
-    category_tree = category_service.build_category_tree()
-    return category_tree
+    category_service = CategoryService(db, background_tasks)
+    category_tree = category_service.get_category_tree_json()
+    return raw_json_response(category_tree)
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
@@ -97,12 +99,15 @@ def delete_category(
 
 @router.post("/cache/invalidate", status_code=status.HTTP_204_NO_CONTENT)
 def invalidate_category_cache(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """
     Invalidate category tree cache (Admin only)
+    
+    The keys are cleared in the background so the response returns immediately.
     """
     category_service = CategoryService(db)
-    category_service.invalidate_category_tree_cache()
+    background_tasks.add_task(category_service.invalidate_category_tree_cache)
     return None
\ No newline at end of file
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 from app.database import get_db
 from app.schemas.order import OrderCreate, OrderResponse, OrderListResponse
 from app.models.user import User
 from app.core.dependencies import get_current_user
 from app.services.order_service import OrderService
 from app.config import settings
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.responses import json_response
 
 router = APIRouter()
 
@@ -33,29 +36,44 @@ def create_order(
 
 @router.get("/", response_model=OrderListResponse)
 def get_my_orders(
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
+    page: Optional[int] = Query(None, ge=1, deprecated=True),
     page_size: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get paginated list of current user's orders
+    Get paginated list of current user's orders (newest first)
     
-    - **page**: Page number
+    - **cursor**: `next_cursor` value from the previous page
+    - **page**: Page number (deprecated, use `cursor` instead)
     - **page_size**: Items per page
     """
     order_service = OrderService(db)
-    orders, total = order_service.get_user_orders(current_user.id, page, page_size)
     
-    total_pages = (total + page_size - 1) // page_size
+    if page is not None and cursor is None:
+        orders, total = order_service.get_user_orders(current_user.id, page, page_size)
+        
+        total_pages = (total + page_size - 1) // page_size
+        
+        return json_response(OrderListResponse, {
+            "items": orders,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": total_pages,
+            "has_next": page < total_pages
+        })
     
-    return {
+    before_id = decode_cursor(cursor) if cursor else None
+    orders, has_next = order_service.get_user_orders_after(current_user.id, before_id, page_size)
+    
+    return json_response(OrderListResponse, {
         "items": orders,
-        "total": total,
-        "page": page,
         "page_size": page_size,
-        "total_pages": total_pages
-    }
+        "has_next": has_next,
+        "next_cursor": encode_cursor(orders[-1].id) if has_next else None
+    })
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
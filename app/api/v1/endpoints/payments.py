@@ -1,14 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Any, Tuple
+import orjson
 from app.database import get_db
 from app.schemas.payment import PaymentCreate, PaymentResponse, PaymentConfirmation
 from app.models.user import User
 from app.core.dependencies import get_current_user
 from app.services.payment_service import PaymentService
+from app.payment_providers import PaymentFactory
 
 router = APIRouter()
 
+# Providers are registered at import time, so the response never changes
+_PROVIDERS = PaymentFactory.get_available_providers()
+_PROVIDERS_RESPONSE = {
+    "providers": list(_PROVIDERS),
+    "count": len(_PROVIDERS)
+}
+
 
 @router.post("/create", status_code=status.HTTP_201_CREATED)
 def create_payment(
@@ -76,6 +86,12 @@ def confirm_payment(
     }
 
 
+@router.get("/providers")
+def get_available_providers():
+    """Get list of available payment providers"""
+    return _PROVIDERS_RESPONSE
+
+
 @router.get("/{payment_id}", response_model=PaymentResponse)
 def get_payment(
     payment_id: int,
@@ -101,6 +117,19 @@ def get_payment_by_order(
 
 
 # Webhook endpoints
+async def _read_webhook(request: Request) -> Tuple[bytes, Any]:
+    """Read the raw webhook body once and parse it with orjson"""
+    raw_body = await request.body()
+    try:
+        payload = orjson.loads(raw_body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid JSON payload"
+        )
+    return raw_body, payload
+
+
 @router.post("/webhooks/stripe")
 async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
     """
@@ -108,11 +137,19 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
     
     Receives payment status updates from Stripe.
     Automatically updates payment and order status.
+    The Stripe-Signature header is verified against the raw body.
     """
-    payload = await request.json()
+    raw_body, payload = await _read_webhook(request)
     
+    # Keep the blocking DB/provider work off the event loop
     payment_service = PaymentService(db)
-    result = payment_service.handle_webhook("stripe", payload)
+    result = await run_in_threadpool(
+        payment_service.handle_webhook,
+        "stripe",
+        payload,
+        raw_body,
+        request.headers.get("stripe-signature")
+    )
     
     return {"status": "received", "result": result}
 
@@ -124,22 +161,16 @@ async def bkash_webhook(request: Request, db: Session = Depends(get_db)):
     
     Receives payment status from bKash after user completes payment.
     Updates payment and order status accordingly.
+    A JSON array of callbacks (reconciliation) is processed as one batch.
     """
-    payload = await request.json()
+    raw_body, payload = await _read_webhook(request)
     
+    # Keep the blocking DB/provider work off the event loop
     payment_service = PaymentService(db)
-    result = payment_service.handle_webhook("bkash", payload)
+    if isinstance(payload, list):
+        results = await run_in_threadpool(payment_service.handle_webhook_batch, "bkash", payload, raw_body)
+        return {"status": "received", "results": results}
     
-    return {"status": "received", "result": result}
-
-
-@router.get("/providers")
-def get_available_providers():
-    """Get list of available payment providers"""
-    from app.payment_providers import PaymentFactory
+    result = await run_in_threadpool(payment_service.handle_webhook, "bkash", payload, raw_body)
     
-    providers = PaymentFactory.get_available_providers()
-    return {
-        "providers": providers,
-        "count": len(providers)
-    }
\ No newline at end of file
+    return {"status": "received", "result": result}
\ No newline at end of file
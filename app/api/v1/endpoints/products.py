@@ -1,12 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
-from app.database import get_db
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+from app.database import get_db, SessionLocal
+from app.schemas.product import (
+    ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, ProductStatusValue, ProductSearchMode
+)
 from app.models.user import User
 from app.core.dependencies import get_current_user, get_current_admin_user
 from app.services.product_service import ProductService
 from app.config import settings
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.responses import json_response
 
 router = APIRouter()
 
@@ -35,33 +40,97 @@ def create_product(
 
 @router.get("/", response_model=ProductListResponse)
 def get_products(
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
+    page: Optional[int] = Query(None, ge=1, deprecated=True),
     page_size: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
-    status: Optional[str] = Query(None, regex="^(active|inactive)$"),
+    status: Optional[ProductStatusValue] = Query(None),
     category_id: Optional[int] = None,
     search: Optional[str] = None,
+    search_mode: ProductSearchMode = Query("substring"),
     db: Session = Depends(get_db)
 ):
     """
     Get paginated list of products with filters
     
-    - **page**: Page number
+    - **cursor**: `next_cursor` value from the previous page
+    - **page**: Page number (deprecated, use `cursor` instead)
     - **page_size**: Items per page
     - **status**: Filter by status (active/inactive)
     - **category_id**: Filter by category
     - **search**: Search in name or description
+    - **search_mode**: substring (name or description) or prefix (name starts with)
     """
     product_service = ProductService(db)
-    products, total = product_service.get_products(page, page_size, status, category_id, search)
     
-    total_pages = (total + page_size - 1) // page_size
+    if page is not None and cursor is None:
+        products, total = product_service.get_products(page, page_size, status, category_id, search, search_mode)
+        
+        total_pages = (total + page_size - 1) // page_size
+        
+        return json_response(ProductListResponse, {
+            "items": products,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": total_pages,
+            "has_next": page < total_pages
+        })
     
-    return {
+    after_id = decode_cursor(cursor) if cursor else None
+    products, has_next = product_service.get_products_after(
+        after_id, page_size, status, category_id, search, search_mode
+    )
+    
+    return json_response(ProductListResponse, {
         "items": products,
-        "total": total,
-        "page": page,
         "page_size": page_size,
-        "total_pages": total_pages
+        "has_next": has_next,
+        "next_cursor": encode_cursor(products[-1].id) if has_next else None
+    })
+
+
+@router.get("/stream")
+def stream_products(
+    status: Optional[ProductStatusValue] = Query(None),
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    search_mode: ProductSearchMode = Query("substring")
+):
+    """
+    Stream all matching products as NDJSON (one product per line)
+    
+    - **status**: Filter by status (active/inactive)
+    - **category_id**: Filter by category
+    - **search**: Search in name or description
+    - **search_mode**: substring (name or description) or prefix (name starts with)
+    """
+    def generate():
+        # The response outlives the request dependencies, so the
+        # generator owns its session
+        db = SessionLocal()
+        try:
+            product_service = ProductService(db)
+            for product in product_service.iter_products(status, category_id, search, search_mode):
+                yield ProductResponse.model_validate(product).model_dump_json().encode() + b"\n"
+        finally:
+            db.close()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.get("/count")
+def get_product_count(db: Session = Depends(get_db)):
+    """
+    Get the (approximate) total number of products
+    
+    Cheap replacement for the totals dropped from cursor-paginated listings.
+    """
+    product_service = ProductService(db)
+    count, estimated = product_service.estimate_product_count()
+    
+    return {
+        "count": count,
+        "estimated": estimated
     }
 
 
@@ -69,7 +138,7 @@ def get_products(
 def get_product(product_id: int, db: Session = Depends(get_db)):
     """Get product by ID"""
     product_service = ProductService(db)
-    product = product_service.get_product_by_id(product_id)
+    product = product_service.get_product_detail(product_id)
     
     if not product:
         raise HTTPException(
@@ -1,4 +1,5 @@
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
 
 
@@ -9,14 +10,33 @@ class Settings(BaseSettings):
     APP_NAME: str = "E-Commerce Backend API"
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = True
+    # Worker threads for sync endpoints (AnyIO defaults to 40)
+    THREADPOOL_MAX_WORKERS: int = 100
     
     # Database
     DATABASE_URL: str
     DATABASE_ECHO: bool = False
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_USE_LIFO: bool = True  # reuse the warmest connection; idle extras age out
+    DB_INSERTMANYVALUES_PAGE_SIZE: int = 1000  # rows per multi-row INSERT batch
+    DB_EXECUTEMANY_BATCH_PAGE_SIZE: int = 500  # psycopg2 execute_batch page size
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     CACHE_TTL: int = 3600  # 1 hour
+    CACHE_STALE_TTL: int = 300  # expired entries still served while one worker rebuilds
+    CACHE_LOCK_TTL: int = 30  # upper bound for a cache rebuild
+    CATEGORY_LOOKUP_TTL: int = 60  # in-process category path/descendants lookups
+    PRODUCT_CACHE_TTL: int = 600  # 10 minutes
+    COUNT_CACHE_TTL: int = 30  # page-based listing totals
+    AUTH_CACHE_TTL: int = 300  # upper bound for cached token lookups
+    LOGIN_CACHE_TTL: int = 60
+    LOGIN_FAIL_CACHE_TTL: int = 5  # repeated wrong password answered without hashing
+    LOGIN_MAX_FAILURES: int = 10  # per email and client IP, before that client's logins are refused
+    LOGIN_FAILURE_WINDOW: int = 300  # seconds without a failure that reset the count
     
     # JWT Authentication
     SECRET_KEY: str
@@ -43,6 +63,7 @@ class Settings(BaseSettings):
     BKASH_USERNAME: str 
     BKASH_PASSWORD: str
     BKASH_BASE_URL: str
+    BKASH_TIMEOUT: float = 10.0  # seconds per bKash API call
     
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
@@ -52,10 +73,18 @@ class Settings(BaseSettings):
     ADMIN_EMAIL: str = "admin@ecommerce.com"
     ADMIN_PASSWORD: str = "Admin@123"
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        frozen=True
+    )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load settings once; call get_settings.cache_clear() to reload (e.g. in tests)"""
+    return Settings()
 
 
 # Initialize settings
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
\ No newline at end of file
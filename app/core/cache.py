@@ -1,42 +1,233 @@
 import redis
-import json
-from typing import Optional, Any
+import msgpack
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional, Any, Tuple
 from app.config import settings
 
-# Redis client
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+# Redis client (values are MessagePack bytes, so responses are not decoded)
+redis_client = redis.from_url(settings.REDIS_URL, decode_responses=False)
+
+
+def _msgpack_default(value: Any) -> Any:
+    """Serialize types MessagePack does not handle natively"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
 
 
 class RedisCache:
     """Redis cache wrapper for efficient data caching"""
     
+    @staticmethod
+    def _tag(pipe, tag: str, ttl: int, *keys: str) -> None:
+        """
+        Record keys in a tag set, on a pipeline
+        
+        The tag set's TTL is only ever extended (EXPIRE NX, then GT), so it
+        outlives every member whatever their TTLs.
+        """
+        pipe.sadd(tag, *keys)
+        pipe.expire(tag, ttl, nx=True)
+        pipe.expire(tag, ttl, gt=True)
+    
+    @classmethod
+    def _store(cls, key: str, serialized: bytes, ttl: int, tag: Optional[str]) -> None:
+        """Write a value, optionally recording its key in a tag set"""
+        if tag is None:
+            redis_client.setex(key, ttl, serialized)
+            return
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.setex(key, ttl, serialized)
+        cls._tag(pipe, tag, ttl, key)
+        pipe.execute()
+    
     def get_cached_data(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         try:
             value = redis_client.get(key)
             if value:
-                return json.loads(value)
+                return msgpack.unpackb(value, raw=False)
             return None
         except Exception as e:
             print(f"Cache get error: {e}")
             return None
     
-    def set_cached_data(self, key: str, value: Any, ttl: int = settings.CACHE_TTL) -> bool:
-        """Set value in cache with TTL"""
+    def set_cached_data(
+        self, key: str, value: Any, ttl: int = settings.CACHE_TTL, tag: Optional[str] = None
+    ) -> bool:
+        """Set value in cache with TTL (see invalidate_tag for tag)"""
         try:
-            serialized = json.dumps(value)
-            redis_client.setex(key, ttl, serialized)
+            serialized = msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+            self._store(key, serialized, ttl, tag)
             return True
         except Exception as e:
             print(f"Cache set error: {e}")
             return False
     
-    def invalidate_cache(self, key_prefix: str) -> bool:
-        """Clear all keys matching a pattern"""
+    def get_cached_bytes(self, key: str) -> Optional[bytes]:
+        """Get an already serialized value (e.g. response JSON) as stored"""
+        try:
+            return redis_client.get(key)
+        except Exception as e:
+            print(f"Cache get error: {e}")
+            return None
+    
+    def set_cached_bytes(
+        self, key: str, value: bytes, ttl: int = settings.CACHE_TTL, tag: Optional[str] = None
+    ) -> bool:
+        """Store an already serialized value as-is with TTL (see invalidate_tag for tag)"""
         try:
-            keys = redis_client.keys(f"{key_prefix}*")
+            self._store(key, value, ttl, tag)
+            return True
+        except Exception as e:
+            print(f"Cache set error: {e}")
+            return False
+    
+    def get_cached_bytes_swr(self, key: str) -> Tuple[Optional[bytes], bool]:
+        """
+        Get a value stored with set_cached_bytes_swr and whether it is fresh
+        
+        The value and its freshness marker are read in one pipelined round
+        trip. A stale value is still usable while it gets rebuilt.
+        """
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.exists(f"{key}:fresh")
+            value, fresh = pipe.execute()
+            return value, bool(fresh)
+        except Exception as e:
+            print(f"Cache get error: {e}")
+            return None, False
+    
+    def set_cached_bytes_swr(
+        self,
+        key: str,
+        value: bytes,
+        ttl: int = settings.CACHE_TTL,
+        stale_ttl: int = settings.CACHE_STALE_TTL,
+        tag: Optional[str] = None,
+        generation: Optional[Tuple[str, int]] = None
+    ) -> bool:
+        """
+        Store a serialized value that is fresh for ttl and then served stale
+        (stale-while-revalidate) for stale_ttl more
+        
+        The freshness marker is tagged along with the value. With generation,
+        a (counter key, value read before building the value) pair, nothing
+        is stored if the counter has moved since: the value was built from
+        data that a write has invalidated in the meantime.
+        
+        Returns:
+            True if the value was stored
+        """
+        fresh_key = f"{key}:fresh"
+        try:
+            with redis_client.pipeline() as pipe:
+                if generation is not None:
+                    counter_key, expected = generation
+                    pipe.watch(counter_key)
+                    current = pipe.get(counter_key)
+                    if (int(current) if current else 0) != expected:
+                        return False
+                    pipe.multi()
+                pipe.setex(key, ttl + stale_ttl, value)
+                pipe.setex(fresh_key, ttl, b"1")
+                if tag is not None:
+                    self._tag(pipe, tag, ttl + stale_ttl, key, fresh_key)
+                pipe.execute()
+            return True
+        except redis.WatchError:
+            # The counter moved between the check and the write
+            return False
+        except Exception as e:
+            print(f"Cache set error: {e}")
+            return False
+    
+    def acquire_lock(self, key: str, ttl: int = settings.CACHE_LOCK_TTL) -> bool:
+        """
+        Take a short-lived lock (SET NX EX), e.g. so only one worker rebuilds
+        a cache entry; it is released with delete_cached_data or expires
+        """
+        try:
+            return bool(redis_client.set(key, b"1", nx=True, ex=ttl))
+        except Exception as e:
+            print(f"Cache lock error: {e}")
+            return False
+    
+    def get_counter(self, key: str) -> int:
+        """Get a counter maintained with increment_counter (0 if unset)"""
+        try:
+            value = redis_client.get(key)
+            return int(value) if value else 0
+        except Exception as e:
+            print(f"Cache get error: {e}")
+            return 0
+    
+    def increment_counter(self, key: str, ttl: int) -> int:
+        """Increment a counter and restart its TTL in one round trip"""
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.incr(key)
+            pipe.expire(key, ttl)
+            value, _ = pipe.execute()
+            return value
+        except Exception as e:
+            print(f"Cache set error: {e}")
+            return 0
+    
+    def delete_cached_data(self, *keys: str) -> bool:
+        """Delete exact keys in a single round trip"""
+        if not keys:
+            return True
+        try:
+            redis_client.unlink(*keys)
+            return True
+        except Exception as e:
+            print(f"Cache delete error: {e}")
+            return False
+    
+    def invalidate_tag(self, tag: str) -> bool:
+        """
+        Clear every key stored with the given tag
+        
+        Reads the tag set instead of SCANning the keyspace, so the cost
+        depends on the tagged entries only. Just the members read are
+        removed from the set, so a key tagged concurrently is kept.
+        """
+        try:
+            keys = redis_client.smembers(tag)
             if keys:
-                redis_client.delete(*keys)
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.unlink(*keys)
+                pipe.srem(tag, *keys)
+                pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Cache clear error: {e}")
+            return False
+    
+    def invalidate_cache(self, key_prefix: str, batch_size: int = 500) -> bool:
+        """
+        Clear all keys matching a prefix
+        
+        Uses SCAN instead of KEYS so Redis is never blocked walking the whole
+        keyspace, and UNLINK so the memory is freed off the main thread.
+        """
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pending = 0
+            for key in redis_client.scan_iter(match=f"{key_prefix}*", count=batch_size):
+                pipe.unlink(key)
+                pending += 1
+                if pending >= batch_size:
+                    pipe.execute()
+                    pending = 0
+            if pending:
+                pipe.execute()
             return True
         except Exception as e:
             print(f"Cache clear error: {e}")
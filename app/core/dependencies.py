@@ -1,13 +1,18 @@
 import logging
+import time
+from hashlib import blake2b
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.core.security import decode_access_token
+from app.core.cache import redis_cache
+from app.config import settings
 from app.models.user import User
+from app.services.user_service import UserService
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=logging.DEBUG if settings.DEBUG else logging.WARNING)
 logger = logging.getLogger(__name__)
 
 # HTTPBearer scheme for token authentication
@@ -22,9 +27,10 @@ def get_user_from_token(
     Decode JWT token, and get user from database.
     
     This dependency is intended to be used by other dependencies.
+    Verified tokens are cached (by hash) against their user ID, so repeat
+    requests skip the JWT decode. The user is always read from the session,
+    so deactivation and admin changes apply to the very next request.
     """
-    logger.info(f"Received credentials: {credential.credentials}")
-    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -38,24 +44,31 @@ def get_user_from_token(
     if token.lower().startswith("bearer "):
         token = token[7:]
     
-    logger.info(f"Token after stripping 'bearer ': {token}")
-    
-    payload = decode_access_token(token)
-    logger.info(f"Decoded payload: {payload}")
-    
-    if payload is None:
-        # The decode_access_token function now raises an HTTPException,
-        # so this check might be redundant, but we keep it for safety.
-        raise credentials_exception
-    
-    user_id: int = payload.get("sub")
-    logger.info(f"User ID from token: {user_id}")
+    token_key = f"auth:{blake2b(token.encode(), digest_size=16).hexdigest()}"
+    user_id = redis_cache.get_cached_data(token_key)
     
     if user_id is None:
-        raise credentials_exception
+        payload = decode_access_token(token)
+        
+        if payload is None:
+            # The decode_access_token function now raises an HTTPException,
+            # so this check might be redundant, but we keep it for safety.
+            raise credentials_exception
+        
+        user_id = payload.get("sub")
+        
+        if user_id is None:
+            raise credentials_exception
+        
+        # Never cache a token beyond its own expiry
+        exp = payload.get("exp")
+        ttl = settings.AUTH_CACHE_TTL if exp is None else min(int(exp - time.time()), settings.AUTH_CACHE_TTL)
+        if ttl > 0:
+            redis_cache.set_cached_data(token_key, user_id, ttl)
+        
+        logger.debug("Token cache miss, resolved user %s", user_id)
     
-    user = db.query(User).filter(User.id == user_id).first()
-    logger.info(f"User from database: {user}")
+    user = UserService(db).get_user_by_id(int(user_id))
     
     if user is None:
         raise credentials_exception
@@ -1,12 +1,28 @@
+import base64
+import binascii
+import calendar
+import hashlib
+import hmac
+import json
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
 from fastapi import HTTPException, status
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context: new hashes use argon2id, existing bcrypt hashes
+# still verify and are upgraded on the next successful login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,
+    argon2__parallelism=1
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -14,9 +30,73 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a replacement hash if the stored one is outdated
+    
+    Returns:
+        Tuple of (password is valid, new hash or None)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password[:72])
+    return pwd_context.hash(password)
+
+
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+# HS256 tokens are signed without going through python-jose: the JWT header
+# never changes and the HMAC key schedule is computed once, then copied
+_HS256_HEADER = _b64url_encode(b'{"alg":"HS256","typ":"JWT"}')
+_HS256_SIGNER = hmac.new(settings.SECRET_KEY.encode(), digestmod=hashlib.sha256)
+
+
+def _hs256_signature(signing_input: bytes) -> bytes:
+    signer = _HS256_SIGNER.copy()
+    signer.update(signing_input)
+    return signer.digest()
+
+
+def _hs256_encode(claims: dict) -> str:
+    """Encode and sign a JWT with HS256"""
+    payload = json.dumps(claims, separators=(",", ":")).encode()
+    signing_input = _HS256_HEADER + b"." + _b64url_encode(payload)
+    return (signing_input + b"." + _b64url_encode(_hs256_signature(signing_input))).decode()
+
+
+def _hs256_decode(token: str) -> dict:
+    """Verify an HS256 JWT and return its claims"""
+    try:
+        header_segment, payload_segment, signature_segment = token.split(".")
+        header = json.loads(_b64url_decode(header_segment))
+        signature = _b64url_decode(signature_segment)
+    except (ValueError, binascii.Error):
+        raise JWTError("Invalid token format")
+    
+    if not isinstance(header, dict) or header.get("alg") != "HS256":
+        raise JWTError("The specified alg value is not allowed")
+    
+    signing_input = f"{header_segment}.{payload_segment}".encode()
+    if not hmac.compare_digest(signature, _hs256_signature(signing_input)):
+        raise JWTError("Signature verification failed")
+    
+    try:
+        claims = json.loads(_b64url_decode(payload_segment))
+    except (ValueError, binascii.Error):
+        raise JWTError("Invalid payload")
+    
+    if not isinstance(claims, dict):
+        raise JWTError("Invalid payload")
+    
+    return claims
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -29,24 +109,42 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    
+    if settings.ALGORITHM == "HS256":
+        to_encode["exp"] = calendar.timegm(expire.utctimetuple())
+        return _hs256_encode(to_encode)
+    
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+@lru_cache(maxsize=10_000)
+def _verify_token(token: str) -> dict:
+    """Verify a JWT signature, memoized so repeat tokens skip the HMAC check"""
+    if settings.ALGORITHM == "HS256":
+        return _hs256_decode(token)
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
 def decode_access_token(token: str) -> Optional[dict]:
     """Decode and verify a JWT token"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
+        payload = _verify_token(token)
     except ExpiredSignatureError:
+        payload = None
+    except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired",
+            detail=f"Could not validate credentials: {e}",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except JWTError as e:
+    
+    # A memoized payload may outlive its token, so expiry is checked on every call
+    if payload is None or payload.get("exp", float("inf")) <= time.time():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Could not validate credentials: {e}",
+            detail="Token has expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    return dict(payload)
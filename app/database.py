@@ -1,28 +1,74 @@
+import threading
+import orjson
+from contextvars import ContextVar
+from typing import Optional
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
 from app.config import settings
 
+def _json_serializer(value) -> str:
+    """Serialize JSON/JSONB column values with orjson"""
+    return orjson.dumps(value).decode()
+
+
+def _driver_options() -> dict:
+    """
+    psycopg2-only executemany tuning: INSERTs already use insertmanyvalues,
+    values_plus_batch also batches executemany UPDATE/DELETE statements
+    """
+    if make_url(settings.DATABASE_URL).get_driver_name() != "psycopg2":
+        return {}
+    return {
+        "executemany_mode": "values_plus_batch",
+        "executemany_batch_page_size": settings.DB_EXECUTEMANY_BATCH_PAGE_SIZE,
+    }
+
+
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DATABASE_ECHO,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_use_lifo=settings.DB_POOL_USE_LIFO,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    insertmanyvalues_page_size=settings.DB_INSERTMANYVALUES_PAGE_SIZE,
+    **_driver_options()
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Identifies the current HTTP request; set by the request-scope middleware
+request_scope: ContextVar[Optional[object]] = ContextVar("request_scope", default=None)
+
+
+def _session_scope() -> object:
+    """
+    Scope sessions per request rather than per thread, since sync endpoints
+    and their dependencies may run on different worker threads. Code running
+    outside a request (scripts, shell) falls back to the current thread.
+    """
+    scope = request_scope.get()
+    return scope if scope is not None else threading.get_ident()
+
+
+# One session per request, shared by every dependency that asks for it
+SessionScoped = scoped_session(SessionLocal, scopefunc=_session_scope)
+
 # Base class for models
 Base = declarative_base()
 
 
 def get_db():
-    """Dependency for getting database session"""
-    db = SessionLocal()
+    """Dependency for getting the request-scoped database session"""
     try:
-        yield db
+        yield SessionScoped()
     finally:
-        db.close()
\ No newline at end of file
+        SessionScoped.remove()
\ No newline at end of file
@@ -1,7 +1,29 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+from anyio import to_thread
+from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from app.config import settings
+from app.database import engine, request_scope, SessionScoped
 from app.api.v1.router import api_router
+from app.core.dependencies import get_current_admin_user
+from app.models.user import User
+from app.payment_providers.bkash_provider import close_http_client
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks"""
+    # Sync endpoints and DB work run in AnyIO worker threads; size the
+    # pool so DB-bound requests don't queue behind the default limit
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_MAX_WORKERS
+    yield
+    close_http_client()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -9,7 +31,8 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="E-Commerce Backend API with multi-provider payment support",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -22,6 +45,17 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def db_session_scope(request: Request, call_next):
+    """Give each request its own session scope and always release it"""
+    token = request_scope.set(object())
+    try:
+        return await call_next(request)
+    finally:
+        SessionScoped.remove()
+        request_scope.reset(token)
+
+
 @app.get("/")
 def root():
     """Root endpoint"""
@@ -31,6 +65,27 @@ def root():
         "docs": "/docs"
     }
 
+@app.get("/health/db")
+def db_health():
+    """Database connectivity check (503 when the database is unreachable)"""
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        logger.exception("Database health check failed")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database unavailable"
+        )
+    
+    return {"status": "ok"}
+
+
+@app.get("/health/db/pool")
+def db_pool_status(current_user: User = Depends(get_current_admin_user)):
+    """Connection pool sizing and checkout counts (admin only)"""
+    return {"pool": engine.pool.status()}
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -8,21 +8,27 @@ class Category(Base):
     """Category model for organizing products"""
     
     __tablename__ = "categories"
+    __table_args__ = (
+        # Slug prefix lookups: WHERE slug LIKE 'base-%' (any collation)
+        Index("ix_categories_slug_pattern", "slug", postgresql_ops={"slug": "varchar_pattern_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), unique=True, index=True, nullable=False)
     slug = Column(String(255), unique=True, index=True, nullable=False) # Added slug column
     description = Column(String(500), nullable=True)
-    parent_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    parent_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Self-referencing relationship for subcategories
     parent = relationship("Category", remote_side=[id], back_populates="children")
-    children = relationship("Category", back_populates="parent")
+    # passive_deletes: delete_category refuses non-empty categories, so the
+    # ORM need not load these collections to null their foreign keys
+    children = relationship("Category", back_populates="parent", passive_deletes=True)
     
     # Products in this category
-    products = relationship("Product", back_populates="category")
+    products = relationship("Product", back_populates="category", passive_deletes=True)
     
     def __repr__(self):
         return f"<Category(id={self.id}, name='{self.name}')>"
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Numeric, Enum, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Numeric, Enum, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -16,6 +16,12 @@ class Order(Base):
     """Order model representing customer orders"""
     
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? AND id < ? ORDER BY id DESC
+        Index("ix_orders_user_id_id", "user_id", "id"),
+        # Legacy listing: WHERE user_id = ? ORDER BY created_at DESC (scanned backwards)
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -38,12 +44,6 @@ class Order(Base):
         self.total_amount = total
         return float(total)
     
-    def mark_as_paid(self):
-        """Mark order as paid and reduce stock"""
-        self.status = OrderStatus.PAID
-        for item in self.order_items:
-            item.product.reduce_stock(item.quantity)
-    
     def cancel(self):
         """Cancel the order"""
         if self.status == OrderStatus.PENDING:
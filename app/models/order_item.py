@@ -19,7 +19,8 @@ class OrderItem(Base):
     
     # Relationships
     order = relationship("Order", back_populates="order_items")
-    product = relationship("Product", back_populates="order_items")
+    # Order reads only need product_id; raise instead of a silent per-item load
+    product = relationship("Product", back_populates="order_items", lazy="raise_on_sql")
     
     def __repr__(self):
         return f"<OrderItem(id={self.id}, order_id={self.order_id}, product_id={self.product_id})>"
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Enum, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Enum, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 import enum
 from app.database import Base
@@ -11,6 +12,10 @@ class PaymentProvider(str, enum.Enum):
     BKASH = "bkash"
 
 
+# Plain string values, computed once for validators
+PAYMENT_PROVIDER_VALUES = tuple(provider.value for provider in PaymentProvider)
+
+
 class PaymentStatus(str, enum.Enum):
     """Payment status enumeration"""
     PENDING = "pending"
@@ -18,22 +23,31 @@ class PaymentStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+PAYMENT_STATUS_VALUES = tuple(payment_status.value for payment_status in PaymentStatus)
+
+
 class Payment(Base):
     """Payment model for tracking payment transactions"""
     
     __tablename__ = "payments"
+    __table_args__ = (
+        # Order payment lookups: WHERE order_id = ? [AND status = ?]
+        Index("ix_payments_order_id_status", "order_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
-    provider = Column(Enum(PaymentProvider), nullable=False, index=True)
-    transaction_id = Column(String(255), unique=True, index=True, nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    provider = Column(Enum(PaymentProvider), nullable=False)
+    transaction_id = Column(String(64), unique=True, index=True, nullable=False)  # bKash ~17, Stripe ~27 chars
     status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING, nullable=False, index=True)
-    raw_response = Column(JSON, nullable=True)  # Store complete provider response
+    # Store provider response; deferred so payment reads skip the blob unless
+    # it is accessed (or requested with undefer(Payment.raw_response))
+    raw_response = deferred(Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    order = relationship("Order", back_populates="payments")
+    order = relationship("Order", back_populates="payments", lazy="raise_on_sql")
     
     def __repr__(self):
         return f"<Payment(id={self.id}, provider='{self.provider}', status='{self.status}')>"
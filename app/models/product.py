@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, Enum, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Numeric, Enum, DateTime, ForeignKey, Text, Index, text, update
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -11,10 +11,33 @@ class ProductStatus(str, enum.Enum):
     INACTIVE = "inactive"
 
 
+# Plain string values, computed once for validators and filters
+PRODUCT_STATUS_VALUES = tuple(product_status.value for product_status in ProductStatus)
+
+
 class Product(Base):
     """Product model with inventory management"""
     
     __tablename__ = "products"
+    __table_args__ = (
+        # Keyset pagination: WHERE status = ? AND id > ? ORDER BY id
+        Index("ix_products_status_id", "status", "id"),
+        # Storefront listing: WHERE status = 'active' AND category_id = ? AND id > ? ORDER BY id
+        # (Enum columns store member names, hence 'ACTIVE')
+        Index(
+            "ix_products_active_category_id", "category_id", "id",
+            postgresql_where=text("status = 'ACTIVE'")
+        ),
+        # Trigram indexes so the ILIKE '%term%' search can avoid a full scan
+        Index(
+            "ix_products_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_products_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
@@ -28,19 +51,49 @@ class Product(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    category = relationship("Category", back_populates="products")
-    order_items = relationship("OrderItem", back_populates="product")
+    # raise_on_sql: callers must eager-load these explicitly (no silent N+1)
+    category = relationship("Category", back_populates="products", lazy="raise_on_sql")
+    order_items = relationship(
+        "OrderItem", back_populates="product", lazy="raise_on_sql", passive_deletes=True
+    )
     
     def __repr__(self):
         return f"<Product(id={self.id}, sku='{self.sku}', name='{self.name}')>"
     
-    def reduce_stock(self, quantity: int) -> bool:
-        """Reduce product stock safely"""
-        if self.stock >= quantity:
-            self.stock -= quantity
-            return True
-        return False
+    @classmethod
+    def try_reduce_stock(cls, session, product_id: int, quantity: int) -> bool:
+        """
+        Atomically reduce stock with a single conditional UPDATE
+        
+        The stock check runs inside the UPDATE, so concurrent callers cannot
+        both pass it and oversell. Rows already loaded in the session are
+        not refreshed until they expire (e.g. on commit).
+        
+        Args:
+            session: Database session
+            product_id: Product ID
+            quantity: Quantity to reduce
+            
+        Returns:
+            True if the product existed and had enough stock
+        """
+        result = session.execute(
+            update(cls)
+            .where(cls.id == product_id, cls.stock >= quantity)
+            .values(stock=cls.stock - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
     
     def is_in_stock(self, quantity: int = 1) -> bool:
         """Check if product has sufficient stock"""
-        return self.stock >= quantity and self.status == ProductStatus.ACTIVE
\ No newline at end of file
+        return self.stock >= quantity and self.status == ProductStatus.ACTIVE
+
+
+# Prefix search: WHERE lower(name) LIKE 'term%' (text_pattern_ops, since
+# lower() returns text, lets LIKE use the B-tree under any collation)
+Index(
+    "ix_products_name_lower_pattern",
+    func.lower(Product.name).label("name_lower"),
+    postgresql_ops={"name_lower": "text_pattern_ops"}
+)
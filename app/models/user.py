@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -8,9 +8,13 @@ class User(Base):
     """User model for authentication and user management"""
     
     __tablename__ = "users"
+    __table_args__ = (
+        # Case-insensitive email uniqueness and lookups: WHERE lower(email) = ?
+        Index("ix_users_email_lower", text("lower(email)"), unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    email = Column(String(255), unique=True, index=True, nullable=False)
+    email = Column(String(255), nullable=False)  # unique via ix_users_email_lower
     hashed_password = Column(String(255), nullable=False)
     full_name = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True)
@@ -1,8 +1,14 @@
-from typing import Dict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Tuple
 from app.payment_providers.base import PaymentProvider
 from app.payment_providers.stripe_provider import StripeProvider
 from app.payment_providers.bkash_provider import BkashProvider
 
+# Provider singletons, for callers that know the provider statically
+STRIPE_PROVIDER = StripeProvider()
+BKASH_PROVIDER = BkashProvider()
+
 
 class PaymentFactory:
     """
@@ -12,12 +18,17 @@ class PaymentFactory:
     new payment providers without modifying existing code.
     """
     
-    _providers: Dict[str, PaymentProvider] = {}
+    # Read-only registry; register_provider swaps in a new mapping
+    _providers: Mapping[str, PaymentProvider] = MappingProxyType({
+        "stripe": STRIPE_PROVIDER,
+        "bkash": BKASH_PROVIDER,
+    })
     
     @classmethod
     def register_provider(cls, name: str, provider: PaymentProvider):
         """Register a new payment provider"""
-        cls._providers[name] = provider
+        cls._providers = MappingProxyType({**cls._providers, name: provider})
+        cls.get_available_providers.cache_clear()
     
     @classmethod
     def get_provider(cls, provider_name: str) -> PaymentProvider:
@@ -33,20 +44,23 @@ class PaymentFactory:
         Raises:
             ValueError: If provider not found
         """
-        if provider_name not in cls._providers:
-            raise ValueError(f"Payment provider '{provider_name}' not found")
-        
-        return cls._providers[provider_name]
+        try:
+            return cls._providers[provider_name]
+        except KeyError:
+            raise ValueError(f"Payment provider '{provider_name}' not found") from None
     
     @classmethod
-    def get_available_providers(cls) -> list:
-        """Get list of available provider names"""
-        return list(cls._providers.keys())
-
-
-# Register available providers
-PaymentFactory.register_provider("stripe", StripeProvider())
-PaymentFactory.register_provider("bkash", BkashProvider())
+    @lru_cache(maxsize=1)
+    def get_available_providers(cls) -> Tuple[str, ...]:
+        """Get available provider names (memoized until a provider is registered)"""
+        return tuple(cls._providers.keys())
 
 
-__all__ = ["PaymentFactory", "PaymentProvider", "StripeProvider", "BkashProvider"]
\ No newline at end of file
+__all__ = [
+    "PaymentFactory",
+    "PaymentProvider",
+    "StripeProvider",
+    "BkashProvider",
+    "STRIPE_PROVIDER",
+    "BKASH_PROVIDER",
+]
\ No newline at end of file
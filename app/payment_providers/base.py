@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
 class PaymentProvider(ABC):
@@ -11,12 +11,12 @@ class PaymentProvider(ABC):
     """
     
     @abstractmethod
-    def create_payment(self, amount: float, order_id: int, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+    def create_payment(self, amount_cents: int, order_id: int, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Create a payment intent/session
         
         Args:
-            amount: Payment amount
+            amount_cents: Payment amount in the smallest currency unit
             order_id: Associated order ID
             metadata: Additional payment metadata
             
@@ -64,6 +64,22 @@ class PaymentProvider(ABC):
         """
         pass
     
+    def verify_webhook_signature(self, raw_body: bytes, signature: Optional[str]) -> bool:
+        """
+        Verify that a webhook was sent by the provider
+        
+        Providers that sign their webhooks override this; the default accepts
+        every payload.
+        
+        Args:
+            raw_body: Raw request body, exactly as received
+            signature: Signature header sent with the webhook
+            
+        Returns:
+            True if the payload is authentic
+        """
+        return True
+    
     @abstractmethod
     def get_provider_name(self) -> str:
         """
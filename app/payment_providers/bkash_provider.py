@@ -1,9 +1,68 @@
 # app/payment_providers/bkash_provider.py
 
-import uuid
-from typing import Dict, Any
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+import httpx
 from app.payment_providers.base import PaymentProvider
 from app.config import settings
+from app.core.cache import redis_cache
+
+# Mock IDs are drawn from a pool of random hex tokens refilled by a single
+# os.urandom call, instead of generating a UUID per ID
+_TOKEN_LENGTH = 12  # hex chars (6 random bytes)
+_TOKEN_POOL_SIZE = 1024
+_TOKEN_POOL = deque()
+_TOKEN_POOL_LOCK = threading.Lock()
+
+
+def _next_token() -> str:
+    """Pop a random uppercase hex token, refilling the pool when empty"""
+    while True:
+        try:
+            return _TOKEN_POOL.popleft()
+        except IndexError:
+            with _TOKEN_POOL_LOCK:
+                if not _TOKEN_POOL:
+                    block = os.urandom(_TOKEN_LENGTH // 2 * _TOKEN_POOL_SIZE).hex().upper()
+                    _TOKEN_POOL.extend(
+                        block[i:i + _TOKEN_LENGTH] for i in range(0, len(block), _TOKEN_LENGTH)
+                    )
+
+
+# Real mode: one keep-alive HTTP client shared by every provider instance,
+# and the grant token cached until shortly before it expires
+_HTTP_CLIENT: Optional[httpx.Client] = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+_AUTH_TOKEN: Tuple[Optional[str], float] = (None, 0.0)  # (id_token, monotonic expiry)
+_AUTH_TOKEN_LOCK = threading.Lock()
+_AUTH_TOKEN_REFRESH_MARGIN = 60  # seconds
+_AUTH_TOKEN_CACHE_KEY = "bkash:token"  # shared by all workers
+
+
+def _get_http_client() -> httpx.Client:
+    """Create (once) the pooled HTTP client for the bKash API"""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        with _HTTP_CLIENT_LOCK:
+            if _HTTP_CLIENT is None:
+                _HTTP_CLIENT = httpx.Client(
+                    base_url=settings.BKASH_BASE_URL,
+                    timeout=settings.BKASH_TIMEOUT,
+                    limits=httpx.Limits(max_keepalive_connections=20)
+                )
+    return _HTTP_CLIENT
+
+
+def close_http_client() -> None:
+    """Close the pooled bKash HTTP client (application shutdown)"""
+    global _HTTP_CLIENT
+    with _HTTP_CLIENT_LOCK:
+        if _HTTP_CLIENT is not None:
+            _HTTP_CLIENT.close()
+            _HTTP_CLIENT = None
 
 
 class BkashProvider(PaymentProvider):
@@ -19,24 +78,26 @@ class BkashProvider(PaymentProvider):
         # Mock mode - set to True for development/assessment
         self.mock_mode = settings.BKASH_MOCK_MODE if hasattr(settings, 'BKASH_MOCK_MODE') else True
     
-    def create_payment(self, amount: float, order_id: int, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+    def create_payment(self, amount_cents: int, order_id: int, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
         """Create bKash payment (MOCK for assessment)"""
         
         if self.mock_mode:
             # MOCK IMPLEMENTATION - For assessment/testing
-            mock_payment_id = f"BKASH{uuid.uuid4().hex[:12].upper()}"
+            mock_payment_id = "".join(("BKASH", _next_token()))
+            bkash_url = f"http://localhost:8000/mock-bkash-payment?paymentID={mock_payment_id}"
+            amount_str = f"{amount_cents // 100}.{amount_cents % 100:02d}"
             
             return {
                 "success": True,
                 "transaction_id": mock_payment_id,
-                "bkash_url": f"http://localhost:8000/mock-bkash-payment?paymentID={mock_payment_id}",
-                "amount": str(amount),
+                "bkash_url": bkash_url,
+                "amount": amount_str,
                 "status": "pending",
                 "intent": "sale",
                 "raw_response": {
                     "paymentID": mock_payment_id,
-                    "bkashURL": f"http://localhost:8000/mock-bkash-payment?paymentID={mock_payment_id}",
-                    "amount": str(amount),
+                    "bkashURL": bkash_url,
+                    "amount": amount_str,
                     "currency": "BDT",
                     "intent": "sale",
                     "merchantInvoiceNumber": f"INV_{order_id}",
@@ -62,16 +123,18 @@ class BkashProvider(PaymentProvider):
         
         if self.mock_mode:
             # MOCK: Simulate successful payment
+            trx_id = "".join(("TRX", _next_token()[:10]))
+            
             return {
                 "success": True,
                 "transaction_id": transaction_id,
-                "trx_id": f"TRX{uuid.uuid4().hex[:10].upper()}",
+                "trx_id": trx_id,
                 "status": "success",
                 "amount": "0.00",
                 "transactionStatus": "Completed",
                 "raw_response": {
                     "paymentID": transaction_id,
-                    "trxID": f"TRX{uuid.uuid4().hex[:10].upper()}",
+                    "trxID": trx_id,
                     "transactionStatus": "Completed",
                     "amount": "0.00",
                     "currency": "BDT"
@@ -130,12 +193,60 @@ class BkashProvider(PaymentProvider):
         return self.provider_name
     
     def _get_token(self) -> str:
-        """Get bKash auth token (only for real mode)"""
+        """
+        Get bKash auth token (only for real mode)
+        
+        The grant token is reused across requests until shortly before it
+        expires, so most calls skip the token round trip. It is also shared
+        through Redis so each worker process does not grant its own.
+        
+        Raises:
+            httpx.HTTPError: If the token grant request fails
+        """
+        global _AUTH_TOKEN
         if self.mock_mode:
             return "mock_token"
         
-        # Real token generation
-        import requests
-        url = f"{settings.BKASH_BASE_URL}/tokenized/checkout/token/grant"
-        # ... real implementation
-        pass
\ No newline at end of file
+        token, expires_at = _AUTH_TOKEN
+        if token and time.monotonic() < expires_at:
+            return token
+        
+        with _AUTH_TOKEN_LOCK:
+            # Another thread may have refreshed it while we waited
+            token, expires_at = _AUTH_TOKEN
+            if token and time.monotonic() < expires_at:
+                return token
+            
+            # Another worker may already hold a valid token
+            cached = redis_cache.get_cached_data(_AUTH_TOKEN_CACHE_KEY)
+            if cached is not None:
+                remaining = cached["expires_at"] - time.time() - _AUTH_TOKEN_REFRESH_MARGIN
+                if remaining > 0:
+                    _AUTH_TOKEN = (cached["token"], time.monotonic() + remaining)
+                    return cached["token"]
+            
+            response = _get_http_client().post(
+                "/tokenized/checkout/token/grant",
+                headers={
+                    "username": settings.BKASH_USERNAME,
+                    "password": settings.BKASH_PASSWORD
+                },
+                json={
+                    "app_key": settings.BKASH_APP_KEY,
+                    "app_secret": settings.BKASH_APP_SECRET
+                }
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            token = data["id_token"]
+            expires_in = int(data.get("expires_in", 3600))
+            lifetime = max(expires_in - _AUTH_TOKEN_REFRESH_MARGIN, 0)
+            _AUTH_TOKEN = (token, time.monotonic() + lifetime)
+            if lifetime:
+                redis_cache.set_cached_data(
+                    _AUTH_TOKEN_CACHE_KEY,
+                    {"token": token, "expires_at": time.time() + expires_in},
+                    lifetime
+                )
+            return token
\ No newline at end of file
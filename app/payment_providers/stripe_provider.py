@@ -1,14 +1,37 @@
-import stripe
+import hashlib
+import hmac
 import logging
-from typing import Dict, Any
+import time
+from functools import lru_cache
+from typing import Dict, Any, Optional
 from app.payment_providers.base import PaymentProvider
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Configure Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
-stripe.api_version = settings.STRIPE_API_VERSION
+
+@lru_cache(maxsize=None)
+def _stripe():
+    """
+    Import and configure the Stripe SDK on first use
+    
+    The SDK is slow to import, and webhook verification/handling never
+    needs it, so processes that only serve bKash or webhooks skip the cost.
+    """
+    import stripe
+    
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    stripe.api_version = settings.STRIPE_API_VERSION
+    return stripe
+
+
+# PaymentIntent fields worth persisting; the rest of the object is dropped
+_STORED_INTENT_FIELDS = ("id", "status", "amount", "currency", "metadata")
+
+
+def _intent_snapshot(intent: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a PaymentIntent dict to the fields we store"""
+    return {field: intent.get(field) for field in _STORED_INTENT_FIELDS}
 
 
 class StripeProvider(PaymentProvider):
@@ -17,14 +40,12 @@ class StripeProvider(PaymentProvider):
     def __init__(self):
         self.provider_name = "stripe"
     
-    def create_payment(self, amount: float, order_id: int, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+    def create_payment(self, amount_cents: int, order_id: int, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Create Stripe PaymentIntent
         """
+        stripe = _stripe()
         try:
-            # Convert amount to cents
-            amount_cents = int(amount * 100)
-            
             # Create payment intent
             payment_intent = stripe.PaymentIntent.create(
                 amount=amount_cents,
@@ -35,17 +56,19 @@ class StripeProvider(PaymentProvider):
                 },
                 automatic_payment_methods={"enabled": True}
             )
+            # Convert once; plain dict reads avoid StripeObject attribute lookups
+            intent = payment_intent.to_dict()
             
-            logger.info(f"Stripe PaymentIntent created: {payment_intent.id}, Status: {payment_intent.status}")
+            logger.info(f"Stripe PaymentIntent created: {intent['id']}, Status: {intent['status']}")
             
             return {
                 "success": True,
-                "transaction_id": payment_intent.id,
-                "client_secret": payment_intent.client_secret,
-                "status": payment_intent.status,
+                "transaction_id": intent["id"],
+                "client_secret": intent["client_secret"],
+                "status": intent["status"],
                 "amount": amount_cents,
                 "currency": "usd",
-                "raw_response": payment_intent
+                "raw_response": _intent_snapshot(intent)
             }
         
         except stripe.error.StripeError as e:
@@ -60,19 +83,20 @@ class StripeProvider(PaymentProvider):
         """
         Confirm Stripe payment (by retrieving its latest status)
         """
+        stripe = _stripe()
         try:
-            payment_intent = stripe.PaymentIntent.retrieve(transaction_id)
+            intent = stripe.PaymentIntent.retrieve(transaction_id).to_dict()
             
-            logger.info(f"Stripe PaymentIntent retrieved for confirmation: {payment_intent.id}, Status: {payment_intent.status}")
+            logger.info(f"Stripe PaymentIntent retrieved for confirmation: {intent['id']}, Status: {intent['status']}")
             
             # Here, we only retrieve the status. Actual confirmation happens client-side.
             # The status will be 'succeeded' if confirmed, 'requires_action', etc.
             return {
                 "success": True,
-                "transaction_id": payment_intent.id,
-                "status": payment_intent.status, # Return actual status from Stripe
-                "amount": payment_intent.amount,
-                "raw_response": payment_intent
+                "transaction_id": intent["id"],
+                "status": intent["status"], # Return actual status from Stripe
+                "amount": intent["amount"],
+                "raw_response": _intent_snapshot(intent)
             }
         
         except stripe.error.StripeError as e:
@@ -86,18 +110,19 @@ class StripeProvider(PaymentProvider):
         """
         Query Stripe payment status
         """
+        stripe = _stripe()
         try:
-            payment_intent = stripe.PaymentIntent.retrieve(transaction_id)
+            intent = stripe.PaymentIntent.retrieve(transaction_id).to_dict()
             
-            logger.info(f"Stripe PaymentIntent queried: {payment_intent.id}, Status: {payment_intent.status}")
+            logger.info(f"Stripe PaymentIntent queried: {intent['id']}, Status: {intent['status']}")
             
             return {
                 "success": True,
-                "transaction_id": payment_intent.id,
-                "status": payment_intent.status,
-                "amount": payment_intent.amount,
-                "currency": payment_intent.currency,
-                "raw_response": payment_intent
+                "transaction_id": intent["id"],
+                "status": intent["status"],
+                "amount": intent["amount"],
+                "currency": intent["currency"],
+                "raw_response": _intent_snapshot(intent)
             }
         
         except stripe.error.StripeError as e:
@@ -107,6 +132,39 @@ class StripeProvider(PaymentProvider):
                 "error": str(e)
             }
     
+    def verify_webhook_signature(self, raw_body: bytes, signature: Optional[str], tolerance: int = 300) -> bool:
+        """
+        Verify the Stripe-Signature header against the raw request body
+        
+        Computes the HMAC-SHA256 of "{timestamp}.{body}" directly over the
+        received bytes, as described in Stripe's webhook signing docs.
+        """
+        if not signature:
+            return False
+        
+        timestamp = None
+        expected_signatures = []
+        for part in signature.split(","):
+            key, _, value = part.partition("=")
+            if key == "t":
+                timestamp = value
+            elif key == "v1":
+                expected_signatures.append(value)
+        
+        if not timestamp or not timestamp.isdigit() or not expected_signatures:
+            return False
+        
+        if abs(time.time() - int(timestamp)) > tolerance:
+            return False
+        
+        computed = hmac.new(
+            settings.STRIPE_WEBHOOK_SECRET.encode(),
+            timestamp.encode() + b"." + raw_body,
+            hashlib.sha256
+        ).hexdigest()
+        
+        return any(hmac.compare_digest(computed, candidate) for candidate in expected_signatures)
+    
     def handle_webhook(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Handle Stripe webhook
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from typing import Optional, List
 from datetime import datetime
 
@@ -27,8 +27,7 @@ class CategoryResponse(CategoryBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CategoryTreeResponse(CategoryResponse):
@@ -36,4 +35,7 @@ class CategoryTreeResponse(CategoryResponse):
     children: List["CategoryTreeResponse"] = []
 
 # Update forward refs
-CategoryTreeResponse.model_rebuild()
\ No newline at end of file
+CategoryTreeResponse.model_rebuild()
+
+# Built once at import; validates and dumps the whole tree in pydantic-core
+CATEGORY_TREE_ADAPTER = TypeAdapter(List[CategoryTreeResponse])
\ No newline at end of file
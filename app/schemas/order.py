@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from typing import List, Optional
 from decimal import Decimal
@@ -18,8 +18,7 @@ class OrderItemResponse(BaseModel):
     price: Decimal
     subtotal: Decimal
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class OrderCreate(BaseModel):
@@ -37,14 +36,16 @@ class OrderResponse(BaseModel):
     updated_at: Optional[datetime] = None
     order_items: List[OrderItemResponse] = []
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class OrderListResponse(BaseModel):
     """Schema for paginated order list"""
     items: List[OrderResponse]
-    total: int
-    page: int
     page_size: int
-    total_pages: int
\ No newline at end of file
+    next_cursor: Optional[str] = None
+    has_next: bool = False
+    # Only populated by the deprecated page-based pagination
+    total: Optional[int] = None
+    page: Optional[int] = None
+    total_pages: Optional[int] = None
\ No newline at end of file
@@ -1,12 +1,16 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Literal, Optional, Dict, Any
+from app.models.payment import PAYMENT_PROVIDER_VALUES
+
+# Validated as a set lookup rather than a regex match
+PaymentProviderValue = Literal[PAYMENT_PROVIDER_VALUES]
 
 
 class PaymentCreate(BaseModel):
     """Schema for initiating a payment"""
     order_id: int = Field(..., gt=0)
-    provider: str = Field(..., pattern="^(stripe|bkash)$")
+    provider: PaymentProviderValue
 
 
 class PaymentResponse(BaseModel):
@@ -19,8 +23,7 @@ class PaymentResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class StripePaymentIntentResponse(BaseModel):
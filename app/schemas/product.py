@@ -1,7 +1,14 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from decimal import Decimal
+from app.models.product import PRODUCT_STATUS_VALUES
+
+# Validated as a set lookup rather than a regex match
+ProductStatusValue = Literal[PRODUCT_STATUS_VALUES]
+
+# "prefix" matches names starting with the term and can use a B-tree index
+ProductSearchMode = Literal["substring", "prefix"]
 
 
 class ProductBase(BaseModel):
@@ -11,7 +18,7 @@ class ProductBase(BaseModel):
     description: Optional[str] = None
     price: Decimal = Field(..., gt=0, decimal_places=2)
     stock: int = Field(default=0, ge=0)
-    status: str = Field(default="active", pattern="^(active|inactive)$")
+    status: ProductStatusValue = "active"
     category_id: Optional[int] = None
 
 
@@ -26,7 +33,7 @@ class ProductUpdate(BaseModel):
     description: Optional[str] = None
     price: Optional[Decimal] = Field(None, gt=0, decimal_places=2)
     stock: Optional[int] = Field(None, ge=0)
-    status: Optional[str] = Field(None, pattern="^(active|inactive)$")
+    status: Optional[ProductStatusValue] = None
     category_id: Optional[int] = None
 
 
@@ -36,14 +43,16 @@ class ProductResponse(ProductBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ProductListResponse(BaseModel):
     """Schema for paginated product list"""
     items: list[ProductResponse]
-    total: int
-    page: int
     page_size: int
-    total_pages: int
\ No newline at end of file
+    next_cursor: Optional[str] = None
+    has_next: bool = False
+    # Only populated by the deprecated page-based pagination
+    total: Optional[int] = None
+    page: Optional[int] = None
+    total_pages: Optional[int] = None
\ No newline at end of file
@@ -1,44 +1,126 @@
+from collections import defaultdict
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy import exists, inspect, or_, select
+from sqlalchemy.exc import IntegrityError
 from typing import Optional, List, Tuple
-from fastapi import HTTPException, status
+from fastapi import BackgroundTasks, HTTPException, status
+from fastapi.encoders import jsonable_encoder
 from app.models.category import Category
-from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.models.product import Product
+from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse, CATEGORY_TREE_ADAPTER
 from app.config import settings
 from app.core.cache import redis_cache
+from app.database import SessionLocal
+from app.utils.dfs import CategoryTree
 import re
 
+# Slugs keep word characters only: dropping punctuation, whitespace and
+# hyphens (to avoid double hyphens) in one pass
+_SLUG_INVALID_CHARS = re.compile(r"\W+")
+
 
 class CategoryService:
     """
     Category service class for managing product categories.
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, background_tasks: Optional[BackgroundTasks] = None):
         self.db = db
+        # When given, stale tree rebuilds run after the response
+        self.background_tasks = background_tasks
         self.cache = redis_cache
-        self.cache_key_prefix = "category_tree"
+        self.cache_tag = "cat:tag"  # every cached category entry is tagged with this
+        self.tree_cache_key = "cat:tree:v2"  # response JSON bytes
+        self.tree_lock_key = "cat:tree:lock"  # held by the worker rebuilding the tree
+        self.tree_generation_key = "cat:tree:gen"  # bumped by every write
+        self.all_cache_key = "cat:all:v1"
     
     def _generate_unique_slug(self, name: str, exclude_id: Optional[int] = None) -> str:
         """
         Generates a URL-friendly slug from a name and ensures its uniqueness.
         """
-        slug = re.sub(r"[^\w\s-]", "", name).strip().lower()
-        slug = re.sub(r"[-\s]+", "", slug) # Remove hyphens too to avoid double hyphens
+        slug = _SLUG_INVALID_CHARS.sub("", name).lower()
+        
+        # Fetch every taken variant (slug, slug-1, slug-2, ...) in one query
+        query = self.db.query(Category.slug).filter(
+            or_(
+                Category.slug == slug,
+                Category.slug.startswith(f"{slug}-", autoescape=True)
+            )
+        )
+        if exclude_id:
+            query = query.filter(Category.id != exclude_id)
+        used = {row.slug for row in query}
         
         base_slug = slug
         counter = 1
-        while True:
-            query = self.db.query(Category).filter(Category.slug == slug)
-            if exclude_id:
-                query = query.filter(Category.id != exclude_id)
-            existing_slug = query.first()
-            
-            if not existing_slug:
-                return slug
-            
+        while slug in used:
             slug = f"{base_slug}-{counter}"
             counter += 1
+        
+        return slug
+    
+    @staticmethod
+    def _unique_violation_column(error: IntegrityError) -> Optional[str]:
+        """Tell which unique column (name or slug) a write violated, if any."""
+        diag = getattr(error.orig, "diag", None)
+        constraint = getattr(diag, "constraint_name", None)  # PostgreSQL
+        if constraint:
+            return {"ix_categories_name": "name", "ix_categories_slug": "slug"}.get(constraint)
+        
+        # SQLite: "UNIQUE constraint failed: categories.name"
+        message = str(error.orig)
+        for column in ("name", "slug"):
+            if f"categories.{column}" in message:
+                return column
+        return None
+    
+    def _is_loaded(self, category_id: int) -> bool:
+        """
+        Check whether the session already holds the category, loaded and
+        not expired, so its existence is known without a query.
+        """
+        category = self.db.identity_map.get(identity_key(Category, category_id))
+        return category is not None and not inspect(category).expired
+    
+    def _find_conflicts(
+        self,
+        name: Optional[str] = None,
+        slug: Optional[str] = None,
+        parent_id: Optional[int] = None,
+        exclude_id: Optional[int] = None
+    ) -> Tuple[bool, bool, bool]:
+        """
+        Check name and slug uniqueness and parent existence in one query.
+        
+        Args:
+            name: Name that must not be taken (None to skip).
+            slug: Slug that must not be taken (None to skip).
+            parent_id: Parent category that must exist (None to skip).
+            exclude_id: Category ignored by the name/slug checks (the one being updated).
+            
+        Returns:
+            Tuple of (name_taken, slug_taken, parent_exists).
+        """
+        conditions = []
+        if name is not None:
+            conditions.append(Category.name == name)
+        if slug is not None:
+            conditions.append(Category.slug == slug)
+        if parent_id is not None:
+            conditions.append(Category.id == parent_id)
+        if not conditions:
+            return False, False, False
+        
+        rows = self.db.query(Category.id, Category.name, Category.slug).filter(or_(*conditions)).all()
+        others = [row for row in rows if row.id != exclude_id]
+        
+        name_taken = name is not None and any(row.name == name for row in others)
+        slug_taken = slug is not None and any(row.slug == slug for row in others)
+        parent_exists = parent_id is not None and any(row.id == parent_id for row in rows)
+        return name_taken, slug_taken, parent_exists
 
     def create_category(self, category_data: CategoryCreate) -> Category:
         """
@@ -55,88 +137,168 @@ class CategoryService:
                            if the parent category is invalid (e.g., 0),
                            or if the parent category does not exist.
         """
-        # Check if category with the same name already exists
-        existing_category_by_name = self.db.query(Category).filter(Category.name == category_data.name).first()
-        if existing_category_by_name:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Category with this name already exists."
-            )
-        
-        # Generate or validate slug
-        if category_data.slug:
-            # Check if provided slug is unique
-            existing_category_by_slug = self.db.query(Category).filter(Category.slug == category_data.slug).first()
-            if existing_category_by_slug:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Category with this slug already exists."
-                )
-            slug = category_data.slug
-        else:
-            slug = self._generate_unique_slug(category_data.name)
+        parent_id = category_data.parent_id
         
         # Validate parent_id if provided
-        if category_data.parent_id is not None: # Explicitly check for None
-            if category_data.parent_id == 0:
+        if parent_id is not None: # Explicitly check for None
+            if parent_id == 0:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Parent category ID cannot be 0. IDs typically start from 1."
                 )
-            parent_category = self.db.query(Category).filter(Category.id == category_data.parent_id).first()
-            if not parent_category:
+            # Served from the identity map when the parent is already loaded
+            if self.db.get(Category, parent_id) is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Parent category with id {category_data.parent_id} not found."
+                    detail=f"Parent category with id {parent_id} not found."
                 )
         
-        category = Category(**category_data.model_dump(exclude_unset=True))
-        category.slug = slug # Assign the generated/validated slug
+        # Use the provided slug or generate a unique one
+        slug = category_data.slug or self._generate_unique_slug(category_data.name)
+        
+        # One compiled dump of the set fields; slug is passed in resolved form
+        category = Category(**category_data.model_dump(exclude_unset=True, exclude={"slug"}), slug=slug)
         
+        # Name and slug uniqueness are left to the unique indexes, so the
+        # common case is a single INSERT with no pre-check query
         self.db.add(category)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            column = self._unique_violation_column(e)
+            if column is None:
+                raise
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Category with this {column} already exists."
+            ) from None
         self.db.refresh(category)
         
         # Invalidate cache after creating a new category
-        self.cache.invalidate_cache(self.cache_key_prefix)
+        self.invalidate_category_tree_cache()
         
         return category
     
     def get_category_by_id(self, category_id: int) -> Optional[Category]:
         """Get a category by its ID."""
-        return self.db.query(Category).filter(Category.id == category_id).first()
+        return self.db.get(Category, category_id)
+    
+    def get_all_categories(self) -> List[dict]:
+        """
+        Get all categories, served from cache when available.
+        
+        Returns:
+            List of serialized categories.
+        """
+        cached = self.cache.get_cached_data(self.all_cache_key)
+        if cached is not None:
+            return cached
+        
+        categories = self.db.query(Category).all()
+        payload = jsonable_encoder(
+            [CategoryResponse.model_validate(category) for category in categories]
+        )
+        self.cache.set_cached_data(self.all_cache_key, payload, settings.CACHE_TTL, tag=self.cache_tag)
+        return payload
+    
+    def get_category_tree_json(self) -> bytes:
+        """
+        Get the full nested category tree as response JSON, served from cache
+        when available.
+        
+        The final JSON bytes are cached rather than ORM instances or dicts,
+        so a cache hit is a single Redis round trip with nothing to decode or
+        re-encode. Once the entry expires it is still served for
+        CACHE_STALE_TTL while a single worker (holding the rebuild lock)
+        refreshes it, so expiry does not send every request to the database.
+        Writes bump a generation counter and then drop the entry, and a
+        rebuild only stores its result if the counter did not move while it
+        ran, so a tree read before a write is never cached after it.
+        
+        Returns:
+            JSON array of root categories with nested children.
+        """
+        cached, fresh = self.cache.get_cached_bytes_swr(self.tree_cache_key)
+        if cached is None:
+            return self._rebuild_tree_cache()
+        
+        if not fresh and self.cache.acquire_lock(self.tree_lock_key):
+            if self.background_tasks is not None:
+                self.background_tasks.add_task(self.refresh_category_tree_cache)
+            else:
+                return self._rebuild_tree_cache(release_lock=True)
+        
+        return cached
     
-    def get_all_categories(self) -> List[Category]:
-        """Get all categories."""
-        return self.db.query(Category).all()
+    def _rebuild_tree_cache(self, release_lock: bool = False) -> bytes:
+        """
+        Build the tree JSON and cache it, unless a write landed meanwhile.
+        
+        Args:
+            release_lock: Release the rebuild lock afterwards (only for
+                callers that acquired it).
+        """
+        # Read before the categories, so a write committed after them is seen
+        generation = self.cache.get_counter(self.tree_generation_key)
+        
+        tree = self.build_category_tree()
+        payload = CATEGORY_TREE_ADAPTER.dump_json(
+            CATEGORY_TREE_ADAPTER.validate_python(tree, from_attributes=True)
+        )
+        self.cache.set_cached_bytes_swr(
+            self.tree_cache_key, payload, tag=self.cache_tag,
+            generation=(self.tree_generation_key, generation)
+        )
+        if release_lock:
+            self.cache.delete_cached_data(self.tree_lock_key)
+        return payload
+    
+    @classmethod
+    def refresh_category_tree_cache(cls):
+        """
+        Rebuild the cached tree after the response, with a session of its
+        own since the request session is closed by then.
+        """
+        db = SessionLocal()
+        try:
+            cls(db)._rebuild_tree_cache(release_lock=True)
+        finally:
+            db.close()
     
     def build_category_tree(self, parent_id: Optional[int] = None) -> List[Category]:
         """
-        Recursively build a category tree.
+        Build a category tree from a single query.
+        
+        All categories are loaded at once and stitched together in memory
+        by parent_id, instead of one SELECT per node.
+        
+        Args:
+            parent_id: Root of the subtree to return (None for the whole tree).
+        
+        Returns:
+            Categories under parent_id with children populated recursively.
         """
-        cache_key = f"{self.cache_key_prefix}_parent_{parent_id or 'none'}"
-        cached_tree = self.cache.get_cached_data(cache_key)
-        if cached_tree:
-            # Need to convert back to Category objects if needed,
-            # or ensure the caching stores a serializable format that can be
-            # directly used by Pydantic models. For now, assume it works.
-            return cached_tree
-        
-        categories = self.db.query(Category).filter(Category.parent_id == parent_id).all()
-        tree = []
+        categories = self.db.query(Category).order_by(Category.id).all()
+        
+        children_by_parent = defaultdict(list)
+        for category in categories:
+            children_by_parent[category.parent_id].append(category)
+        
         for category in categories:
-            # Ensure children is initialized as a list before appending
-            if not hasattr(category, 'children') or category.children is None:
-                category.children = []
-            category.children = self.build_category_tree(category.id)
-            tree.append(category)
-        
-        self.cache.set_cached_data(cache_key, tree, settings.CACHE_TTL)
-        return tree
+            # Populate the relationship as loaded state, without marking a change
+            set_committed_value(category, "children", children_by_parent.get(category.id, []))
+        
+        return children_by_parent.get(parent_id, [])
     
     def invalidate_category_tree_cache(self):
-        """Invalidate the entire category tree cache."""
-        self.cache.invalidate_cache(self.cache_key_prefix)
+        """Invalidate the cached category tree, category list and CategoryTree lookups."""
+        # Bumped first, so a tree rebuild already running does not store its result
+        self.cache.increment_counter(
+            self.tree_generation_key, settings.CACHE_TTL + settings.CACHE_STALE_TTL
+        )
+        self.cache.invalidate_tag(self.cache_tag)
+        CategoryTree.invalidate_cache()
     
     def update_category(self, category_id: int, category_data: CategoryUpdate) -> Category:
         """
@@ -152,7 +314,9 @@ class CategoryService:
         Raises:
             HTTPException: If the category to update is not found,
                            if a category with the new name already exists,
-                           or if the parent category does not exist.
+                           if the parent category does not exist,
+                           or if the new parent is the category itself or
+                           one of its descendants.
         """
         category = self.get_category_by_id(category_id)
         if not category:
@@ -163,47 +327,70 @@ class CategoryService:
         
         update_data = category_data.model_dump(exclude_unset=True)
         
+        name_changed = "name" in update_data and update_data["name"] != category.name
+        new_slug = update_data.get("slug")
+        slug_changed = bool(new_slug) and new_slug != category.slug
+        parent_id = update_data.get("parent_id")
+        # The current parent and parents already in the session need no query
+        check_parent = (
+            bool(parent_id) and parent_id != category.parent_id
+            and not self._is_loaded(parent_id)
+        )
+        
+        # Name, explicit slug and parent are all checked in one query
+        name_taken, slug_taken, parent_exists = self._find_conflicts(
+            name=update_data["name"] if name_changed else None,
+            slug=new_slug if slug_changed else None,
+            parent_id=parent_id if check_parent else None,
+            exclude_id=category.id
+        )
+        
         # Handle slug generation/update
-        if "name" in update_data and update_data["name"] != category.name:
-            # If name changes and slug is not explicitly provided, generate a new slug
-            if "slug" not in update_data or not update_data["slug"]:
-                update_data["slug"] = self._generate_unique_slug(update_data["name"], exclude_id=category.id)
-        elif "slug" in update_data and update_data["slug"] != category.slug:
+        if slug_changed:
             # If slug is explicitly provided and changed, ensure uniqueness
-            existing_category_by_slug = self.db.query(Category).filter(
-                Category.slug == update_data["slug"],
-                Category.id != category.id
-            ).first()
-            if existing_category_by_slug:
+            if slug_taken:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Category with this slug already exists."
                 )
+        elif name_changed and not new_slug:
+            # If name changes and slug is not explicitly provided, generate a new slug
+            update_data["slug"] = self._generate_unique_slug(update_data["name"], exclude_id=category.id)
 
         # Check if category name is being updated and if it conflicts with an existing name (after slug handling)
-        if "name" in update_data and update_data["name"] != category.name:
-            existing_category_by_name = self.db.query(Category).filter(
-                Category.name == update_data["name"],
-                Category.id != category.id
-            ).first()
-            if existing_category_by_name:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Category with this name already exists."
-                )
+        if name_taken:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Category with this name already exists."
+            )
         
         # Validate parent_id if being updated
-        if "parent_id" in update_data and update_data["parent_id"] is not None: # Explicitly check for None
-            if update_data["parent_id"] == 0:
+        if parent_id is not None: # Explicitly check for None
+            if parent_id == 0:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Parent category ID cannot be 0. IDs typically start from 1."
                 )
-            parent_category = self.db.query(Category).filter(Category.id == update_data["parent_id"]).first()
-            if not parent_category:
+            if parent_id == category.id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="A category cannot be its own parent."
+                )
+            if check_parent and not parent_exists:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Parent category with id {update_data['parent_id']} not found."
+                    detail=f"Parent category with id {parent_id} not found."
+                )
+            # Moving under a descendant would create a cycle; load the
+            # descendants fresh, as the in-process lookup may lag behind
+            # writes made by other workers
+            if (
+                parent_id != category.parent_id
+                and parent_id in CategoryTree._load_descendants(self.db, category.id)
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="A category cannot be moved under one of its descendants."
                 )
         
         for field, value in update_data.items():
@@ -213,7 +400,7 @@ class CategoryService:
         self.db.refresh(category)
         
         # Invalidate cache after updating a category
-        self.cache.invalidate_cache(self.cache_key_prefix)
+        self.invalidate_category_tree_cache()
         
         return category
     
@@ -238,15 +425,21 @@ class CategoryService:
                 detail="Category not found."
             )
         
-        # Check for associated products
-        if self.db.query(Category).join(Category.products).filter(Category.id == category_id).first():
+        # Check for associated products and child categories in one query
+        has_products, has_children = self.db.execute(
+            select(
+                exists().where(Product.category_id == category_id),
+                exists().where(Category.parent_id == category_id)
+            )
+        ).one()
+        
+        if has_products:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot delete category with associated products."
             )
         
-        # Check for child categories
-        if category.children:
+        if has_children:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot delete category with child categories. Please reassign or delete children first."
@@ -256,6 +449,6 @@ class CategoryService:
         self.db.commit()
         
         # Invalidate cache after deleting a category
-        self.cache.invalidate_cache(self.cache_key_prefix)
+        self.invalidate_category_tree_cache()
         
         return True
\ No newline at end of file
@@ -1,10 +1,13 @@
-from sqlalchemy.orm import Session
-from typing import List, Tuple
+from collections import Counter
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
 from app.models.order import Order, OrderStatus
 from app.models.order_item import OrderItem
 from app.models.product import Product
 from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.product_service import ProductService
 
 
 class OrderService:
@@ -32,13 +35,24 @@ class OrderService:
         Raises:
             HTTPException: If validation fails
         """
+        # Load and lock every product in the cart in one query; ordering by ID
+        # keeps lock acquisition consistent across concurrent orders
+        product_ids = {item.product_id for item in order_data.items}
+        products = self.db.query(Product).filter(
+            Product.id.in_(product_ids)
+        ).order_by(Product.id).with_for_update().all()
+        products_by_id = {product.id: product for product in products}
+        
+        # A product may appear on several lines; check stock against the total
+        requested = Counter()
+        for item_data in order_data.items:
+            requested[item_data.product_id] += item_data.quantity
+        
         # Validate all products and check stock
         order_items_data = []
         
         for item_data in order_data.items:
-            product = self.db.query(Product).filter(
-                Product.id == item_data.product_id
-            ).first()
+            product = products_by_id.get(item_data.product_id)
             
             if not product:
                 raise HTTPException(
@@ -46,7 +60,7 @@ class OrderService:
                     detail=f"Product with ID {item_data.product_id} not found"
                 )
             
-            if not product.is_in_stock(item_data.quantity):
+            if not product.is_in_stock(requested[product.id]):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Insufficient stock for product: {product.name}"
@@ -58,41 +72,62 @@ class OrderService:
                 "price": product.price
             })
         
-        # Create order
+        # Calculate item subtotals and the order total (Algorithm requirement)
+        total_amount = 0
+        order_item_rows = []
+        for item_data in order_items_data:
+            # Calculate subtotal (deterministic algorithm)
+            subtotal = item_data["price"] * item_data["quantity"]
+            total_amount += subtotal
+            
+            order_item_rows.append({
+                "product_id": item_data["product"].id,
+                "quantity": item_data["quantity"],
+                "price": item_data["price"],
+                "subtotal": subtotal
+            })
+        
+        # Create order with its final total, so no follow-up UPDATE is needed
         order = Order(
             user_id=user_id,
-            total_amount=0,
+            total_amount=total_amount,
             status=OrderStatus.PENDING
         )
         
         self.db.add(order)
         self.db.flush()  # Get order ID
         
-        # Create order items and calculate total (Algorithm requirement)
-        total_amount = 0
-        for item_data in order_items_data:
-            order_item = OrderItem(
-                order_id=order.id,
-                product_id=item_data["product"].id,
-                quantity=item_data["quantity"],
-                price=item_data["price"],
-                subtotal=0
-            )
-            
-            # Calculate subtotal (deterministic algorithm)
-            order_item.calculate_subtotal()
-            total_amount += order_item.subtotal
-            
-            self.db.add(order_item)
+        for row in order_item_rows:
+            row["order_id"] = order.id
         
-        # Set total amount (deterministic algorithm)
-        order.total_amount = total_amount
+        # One multi-row INSERT for all items instead of one per item
+        self.db.execute(insert(OrderItem), order_item_rows)
         
         self.db.commit()
         self.db.refresh(order)
         
         return order
     
+    def _reduce_stock_for_items(self, order_items: List[OrderItem]) -> None:
+        """
+        Reduce stock for all ordered products in a single UPDATE
+        
+        Mirrors Product.try_reduce_stock: the stock check runs inside the
+        UPDATE, and a product without enough stock is left unchanged.
+        """
+        quantities = Counter()
+        for item in order_items:
+            quantities[item.product_id] += item.quantity
+        
+        if not quantities:
+            return
+        
+        quantity = case(quantities, value=Product.id)
+        self.db.query(Product).filter(Product.id.in_(quantities)).update(
+            {Product.stock: case((Product.stock >= quantity, Product.stock - quantity), else_=Product.stock)},
+            synchronize_session=False
+        )
+    
     def get_order_by_id(self, order_id: int, user_id: int = None) -> Order:
         """
         Get order by ID
@@ -107,7 +142,9 @@ class OrderService:
         Raises:
             HTTPException: If not found or unauthorized
         """
-        query = self.db.query(Order).filter(Order.id == order_id)
+        query = self.db.query(Order).options(
+            joinedload(Order.order_items)
+        ).filter(Order.id == order_id)
         
         if user_id:
             query = query.filter(Order.user_id == user_id)
@@ -129,7 +166,10 @@ class OrderService:
         page_size: int = 20
     ) -> Tuple[List[Order], int]:
         """
-        Get paginated list of user orders
+        Get paginated list of user orders (legacy OFFSET pagination)
+        
+        Deprecated in favour of get_user_orders_after, whose cost does not
+        grow with the page number.
         
         Args:
             user_id: User ID
@@ -139,14 +179,50 @@ class OrderService:
         Returns:
             Tuple of (orders list, total count)
         """
-        query = self.db.query(Order).filter(Order.user_id == user_id)
+        offset = (page - 1) * page_size
         
-        total = query.count()
+        # COUNT(*) OVER () returns the total alongside the page in one query
+        rows = self.db.query(Order, func.count().over().label("total")).filter(
+            Order.user_id == user_id
+        ).options(selectinload(Order.order_items)).order_by(
+            Order.created_at.desc()
+        ).offset(offset).limit(page_size).all()
         
-        offset = (page - 1) * page_size
-        orders = query.order_by(Order.created_at.desc()).offset(offset).limit(page_size).all()
+        if rows:
+            return [row.Order for row in rows], rows[0].total
         
-        return orders, total
+        # Past the last page there is no row to carry the total
+        total = self.db.query(Order).filter(Order.user_id == user_id).count() if offset else 0
+        return [], total
+    
+    def get_user_orders_after(
+        self,
+        user_id: int,
+        before_id: Optional[int] = None,
+        page_size: int = 20
+    ) -> Tuple[List[Order], bool]:
+        """
+        Get a page of user orders (newest first) using keyset (cursor) pagination
+        
+        Args:
+            user_id: User ID
+            before_id: ID of the last order on the previous page
+            page_size: Items per page
+            
+        Returns:
+            Tuple of (orders list, whether a next page exists)
+        """
+        query = self.db.query(Order).options(
+            selectinload(Order.order_items)
+        ).filter(Order.user_id == user_id)
+        
+        if before_id is not None:
+            query = query.filter(Order.id < before_id)
+        
+        # Fetch one extra row to know if there is a next page
+        orders = query.order_by(Order.id.desc()).limit(page_size + 1).all()
+        
+        return orders[:page_size], len(orders) > page_size
     
     def cancel_order(self, order_id: int, user_id: int) -> Order:
         """
@@ -179,26 +255,96 @@ class OrderService:
         """
         Mark order as paid and reduce stock (Algorithm requirement)
         
-        This implements the stock reduction algorithm after successful payment
+        This implements the stock reduction algorithm after successful payment.
+        Pending changes in the session (e.g. the payment being marked as
+        successful) are committed in the same transaction.
         
         Args:
             order_id: Order ID
             
         Returns:
             Updated order
+            
+        Raises:
+            HTTPException: If the order is not found or not pending
         """
-        order = self.get_order_by_id(order_id)
+        # Only the columns the status change and stock reduction need;
+        # the full order is loaded again after commit
+        order = self.db.query(Order).options(
+            load_only(Order.id, Order.status, Order.user_id),
+            joinedload(Order.order_items).load_only(OrderItem.product_id, OrderItem.quantity)
+        ).filter(Order.id == order_id).first()
         
-        if order.status != OrderStatus.PENDING:
+        if not order:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Order not found"
+            )
+        
+        # Mark as paid only if still pending, checked inside the UPDATE: of two
+        # concurrent webhooks for the same order, only one moves it (and stock)
+        marked = self.db.query(Order).filter(
+            Order.id == order_id,
+            Order.status == OrderStatus.PENDING
+        ).update({Order.status: OrderStatus.PAID}, synchronize_session=False)
+        
+        if not marked:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Order is not in pending status"
             )
         
-        # Mark as paid and reduce stock (deterministic algorithm)
-        order.mark_as_paid()
+        # Reduce stock (deterministic algorithm)
+        self._reduce_stock_for_items(order.order_items)
         
         self.db.commit()
-        self.db.refresh(order)
+        order = self.get_order_by_id(order_id)
+        
+        # Stock changed, drop the cached details of every product in the order
+        ProductService(self.db).invalidate_product_cache(
+            *(item.product_id for item in order.order_items)
+        )
+        
+        return order
+    
+    def mark_orders_as_paid(self, order_ids: List[int]) -> List[int]:
+        """
+        Mark several orders as paid and reduce their stock in one transaction
+        
+        Batch counterpart of mark_order_as_paid for multi-event webhooks:
+        orders that are no longer pending are skipped instead of raising.
+        Pending changes in the session are committed with it.
+        
+        Args:
+            order_ids: Order IDs
+            
+        Returns:
+            IDs of the orders that were marked as paid
+        """
+        marked_ids = []
+        if order_ids:
+            # One conditional UPDATE moves every still-pending order
+            marked_ids = self.db.execute(
+                update(Order)
+                .where(Order.id.in_(order_ids), Order.status == OrderStatus.PENDING)
+                .values(status=OrderStatus.PAID)
+                .returning(Order.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+        
+        items = []
+        if marked_ids:
+            items = self.db.query(OrderItem.product_id, OrderItem.quantity).filter(
+                OrderItem.order_id.in_(marked_ids)
+            ).all()
+            # Reduce stock (deterministic algorithm)
+            self._reduce_stock_for_items(items)
+        
+        self.db.commit()
+        
+        if items:
+            ProductService(self.db).invalidate_product_cache(
+                *{item.product_id for item in items}
+            )
         
-        return order
\ No newline at end of file
+        return marked_ids
\ No newline at end of file
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from fastapi import HTTPException, status
 from app.models.payment import Payment, PaymentProvider, PaymentStatus
 from app.models.order import Order, OrderStatus
@@ -59,8 +59,9 @@ class PaymentService:
             )
         
         # Create payment with provider
-        amount = float(order.total_amount)
-        result = provider.create_payment(amount, order_id, metadata)
+        # Numeric(10,2) arrives as an exact Decimal; hand providers integer cents
+        amount_cents = int(order.total_amount * 100)
+        result = provider.create_payment(amount_cents, order_id, metadata)
         
         if not result.get("success"):
             raise HTTPException(
@@ -103,7 +104,7 @@ class PaymentService:
         Raises:
             HTTPException: If confirmation fails
         """
-        payment = self.db.query(Payment).filter(Payment.id == payment_id).first()
+        payment = self.db.get(Payment, payment_id)
         
         if not payment:
             raise HTTPException(
@@ -132,17 +133,16 @@ class PaymentService:
         if stripe_status == "succeeded":
             payment.mark_as_success()
             payment.raw_response = result.get("raw_response")
+            # Commits the payment update together with the order transition
             self.order_service.mark_order_as_paid(payment.order_id)
         elif stripe_status in ["requires_payment_method", "requires_action", "processing"]:
             # Payment is still in progress, do not mark as failed or success yet
             # Keep as PENDING in our system or update to a more granular status if available
             # For now, we keep it as PENDING and rely on webhooks for final status
-            pass # Keep payment status as PENDING
+            pass # Keep payment status as PENDING, nothing to write
         else:
             payment.mark_as_failed()
-        
-        self.db.commit()
-        self.db.refresh(payment)
+            self.db.commit()
         
         return payment
     
@@ -156,7 +156,7 @@ class PaymentService:
         Returns:
             Payment status
         """
-        payment = self.db.query(Payment).filter(Payment.id == payment_id).first()
+        payment = self.db.get(Payment, payment_id)
         
         if not payment:
             raise HTTPException(
@@ -185,24 +185,131 @@ class PaymentService:
         # Return the Payment object directly, as it matches PaymentResponse schema structure
         return payment
     
-    def handle_webhook(self, provider_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _get_verified_webhook_provider(
+        self,
+        provider_name: str,
+        raw_body: bytes,
+        signature: Optional[str]
+    ):
+        """
+        Resolve the webhook provider and verify the request signature
+        
+        Raises:
+            HTTPException: If the provider is unknown or the signature is invalid
+        """
+        # Get provider using Strategy Pattern
+        try:
+            provider = PaymentFactory.get_provider(provider_name)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        if not provider.verify_webhook_signature(raw_body, signature):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid webhook signature"
+            )
+        
+        return provider
+    
+    def handle_webhook_batch(
+        self,
+        provider_name: str,
+        payloads: List[Dict[str, Any]],
+        raw_body: bytes = b"",
+        signature: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Handle a webhook delivering several events (e.g. reconciliation)
+        
+        All referenced payments are loaded and locked with one IN query, and
+        every payment and order update is written in a single commit.
+        
+        Args:
+            provider_name: Payment provider
+            payloads: Parsed webhook events
+            raw_body: Raw request body, used for signature verification
+            signature: Signature header sent by the provider
+            
+        Returns:
+            Processing result per event
+            
+        Raises:
+            HTTPException: If the provider is unknown, the signature is invalid
+                or an event is not a JSON object
+        """
+        provider = self._get_verified_webhook_provider(provider_name, raw_body, signature)
+        
+        if not all(isinstance(payload, dict) for payload in payloads):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Each webhook event must be a JSON object"
+            )
+        
+        results = [provider.handle_webhook(payload) for payload in payloads]
+        
+        # Last event wins when a transaction appears more than once
+        updates = {
+            result["transaction_id"]: result
+            for result in results
+            if result.get("success") and result.get("transaction_id")
+            and result.get("status") in ("success", "failed")
+        }
+        if not updates:
+            return results
+        
+        # Row locks serialize this with concurrent webhooks for the same
+        # payments; ordering by ID keeps lock acquisition consistent
+        payments = self.db.query(Payment).filter(
+            Payment.transaction_id.in_(updates)
+        ).order_by(Payment.id).with_for_update().all()
+        
+        paid_order_ids = []
+        for payment in payments:
+            result = updates[payment.transaction_id]
+            if result["status"] == "success":
+                payment.mark_as_success()
+                paid_order_ids.append(payment.order_id)
+            else:
+                payment.mark_as_failed()
+            payment.raw_response = result.get("raw_response")
+        
+        # Marks the orders paid and commits the payment updates with them
+        self.order_service.mark_orders_as_paid(paid_order_ids)
+        
+        return results
+    
+    def handle_webhook(
+        self,
+        provider_name: str,
+        payload: Dict[str, Any],
+        raw_body: bytes = b"",
+        signature: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Handle webhook from payment provider
         
         Args:
             provider_name: Payment provider
-            payload: Webhook payload
+            payload: Parsed webhook payload
+            raw_body: Raw request body, used for signature verification
+            signature: Signature header sent by the provider
             
         Returns:
             Processing result
+            
+        Raises:
+            HTTPException: If the provider is unknown, the signature is invalid
+                or the payload is not a JSON object
         """
-        # Get provider using Strategy Pattern
-        try:
-            provider = PaymentFactory.get_provider(provider_name)
-        except ValueError as e:
+        provider = self._get_verified_webhook_provider(provider_name, raw_body, signature)
+        
+        if not isinstance(payload, dict):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=str(e)
+                detail="Webhook payload must be a JSON object"
             )
         
         # Process webhook
@@ -214,23 +321,23 @@ class PaymentService:
         # Update payment in database
         transaction_id = result.get("transaction_id")
         if transaction_id:
+            # Locked like the batch path, so their status writes cannot interleave
             payment = self.db.query(Payment).filter(
                 Payment.transaction_id == transaction_id
-            ).first()
+            ).with_for_update().first()
             
             if payment:
                 if result.get("status") == "success":
                     payment.mark_as_success()
                     payment.raw_response = result.get("raw_response")
                     
-                    # Mark order as paid
+                    # Mark order as paid (commits the payment update with it)
                     self.order_service.mark_order_as_paid(payment.order_id)
                     
                 elif result.get("status") == "failed":
                     payment.mark_as_failed()
                     payment.raw_response = result.get("raw_response")
-                
-                self.db.commit()
+                    self.db.commit()
         
         return result
     
@@ -1,10 +1,19 @@
+import hashlib
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import Optional, List, Tuple
+from sqlalchemy import exists, func, or_, select, text
+from sqlalchemy.exc import IntegrityError
+from typing import Iterator, Optional, List, Tuple
 from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
 from app.models.product import Product, ProductStatus
 from app.models.category import Category
-from app.schemas.product import ProductCreate, ProductUpdate
+from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductSearchMode
+from app.config import settings
+from app.core.cache import redis_cache
+
+
+# LIKE wildcards in the search term are matched literally
+_LIKE_ESCAPES = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
 
 
 class ProductService:
@@ -14,8 +23,49 @@ class ProductService:
     Encapsulates product-related business logic
     """
     
+    _COUNT_CACHE_TAG = "prod:count:tag"
+    _ESTIMATE_CACHE_KEY = "prod:count:estimate"
+    
     def __init__(self, db: Session):
         self.db = db
+        self.cache = redis_cache
+    
+    @staticmethod
+    def _detail_cache_key(product_id: int) -> str:
+        return f"prod:{product_id}"
+    
+    @staticmethod
+    def _count_cache_key(
+        status: Optional[str], category_id: Optional[int], search: Optional[str],
+        search_mode: ProductSearchMode = "substring"
+    ) -> str:
+        filters = f"{status}\0{category_id}\0{search}\0{search_mode}".encode()
+        return f"prod:count:{hashlib.blake2b(filters, digest_size=8).hexdigest()}"
+    
+    @staticmethod
+    def _is_sku_violation(error: IntegrityError) -> bool:
+        """Tell whether a write violated the unique SKU index"""
+        diag = getattr(error.orig, "diag", None)
+        constraint = getattr(diag, "constraint_name", None)  # PostgreSQL
+        if constraint:
+            return constraint == "ix_products_sku"
+        
+        # SQLite: "UNIQUE constraint failed: products.sku"
+        return "products.sku" in str(error.orig)
+    
+    def _category_exists(self, category_id: int) -> bool:
+        """Check a category exists with SELECT EXISTS, without loading the row"""
+        return self.db.scalar(select(exists().where(Category.id == category_id)))
+    
+    def invalidate_product_counts(self) -> bool:
+        """Drop cached listing counts (products added, removed or re-filtered)"""
+        return self.cache.invalidate_tag(self._COUNT_CACHE_TAG)
+    
+    def invalidate_product_cache(self, *product_ids: int) -> bool:
+        """Drop cached product details for the given IDs"""
+        return self.cache.delete_cached_data(
+            *(self._detail_cache_key(product_id) for product_id in product_ids)
+        )
     
     def create_product(self, product_data: ProductCreate) -> Product:
         """
@@ -30,18 +80,9 @@ class ProductService:
         Raises:
             HTTPException: If SKU already exists or category not found
         """
-        # Check if SKU already exists
-        existing_product = self.db.query(Product).filter(Product.sku == product_data.sku).first()
-        if existing_product:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="SKU already exists"
-            )
-        
         # Check if category exists
         if product_data.category_id is not None:
-            category = self.db.query(Category).filter(Category.id == product_data.category_id).first()
-            if not category:
+            if not self._category_exists(product_data.category_id):
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Category with id {product_data.category_id} not found"
@@ -50,30 +91,105 @@ class ProductService:
         # Create product
         product = Product(**product_data.model_dump())
         
+        # SKU uniqueness is left to the unique index, so the common case
+        # is a single INSERT with no pre-check query
         self.db.add(product)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            if not self._is_sku_violation(e):
+                raise
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="SKU already exists"
+            ) from None
         self.db.refresh(product)
         
+        self.invalidate_product_counts()
+        
         return product
     
     def get_product_by_id(self, product_id: int) -> Optional[Product]:
         """Get product by ID"""
-        return self.db.query(Product).filter(Product.id == product_id).first()
+        return self.db.get(Product, product_id)
+    
+    def get_product_detail(self, product_id: int) -> Optional[dict]:
+        """
+        Get serialized product details, served from cache when available
+        
+        Args:
+            product_id: Product ID
+            
+        Returns:
+            Serialized product, or None if not found
+        """
+        cache_key = self._detail_cache_key(product_id)
+        cached = self.cache.get_cached_data(cache_key)
+        if cached is not None:
+            return cached
+        
+        product = self.get_product_by_id(product_id)
+        if not product:
+            return None
+        
+        payload = jsonable_encoder(ProductResponse.model_validate(product))
+        self.cache.set_cached_data(cache_key, payload, settings.PRODUCT_CACHE_TTL)
+        return payload
     
     def get_product_by_sku(self, sku: str) -> Optional[Product]:
         """Get product by SKU"""
         return self.db.query(Product).filter(Product.sku == sku).first()
     
+    def _build_products_query(
+        self,
+        status: Optional[str] = None,
+        category_id: Optional[int] = None,
+        search: Optional[str] = None,
+        search_mode: ProductSearchMode = "substring"
+    ):
+        """Build the filtered product query shared by the listing methods"""
+        query = self.db.query(Product)
+        
+        # Apply filters
+        if status:
+            query = query.filter(Product.status == status)
+        
+        if category_id:
+            query = query.filter(Product.category_id == category_id)
+        
+        if search:
+            term = search.translate(_LIKE_ESCAPES)
+            if search_mode == "prefix":
+                # Sargable on ix_products_name_lower_pattern
+                query = query.filter(func.lower(Product.name).like(f"{term.lower()}%", escape="\\"))
+            else:
+                # Pattern built once; served by the trigram indexes
+                pattern = f"%{term}%"
+                query = query.filter(
+                    or_(
+                        Product.name.ilike(pattern, escape="\\"),
+                        Product.description.ilike(pattern, escape="\\")
+                    )
+                )
+        
+        return query
+    
     def get_products(
         self, 
         page: int = 1, 
         page_size: int = 20, 
         status: Optional[str] = None,
         category_id: Optional[int] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        search_mode: ProductSearchMode = "substring"
     ) -> Tuple[List[Product], int]:
         """
-        Get paginated list of products with filters
+        Get paginated list of products with filters (legacy OFFSET pagination)
+        
+        Deprecated in favour of get_products_after, whose cost does not
+        grow with the page number. The total is cached briefly per filter
+        set, so paging through results runs COUNT(*) once.
         
         Args:
             page: Page number
@@ -81,29 +197,21 @@ class ProductService:
             status: Filter by status
             category_id: Filter by category
             search: Search in name or description
+            search_mode: "substring" (name or description) or "prefix" (name)
             
         Returns:
             Tuple of (products list, total count)
         """
-        query = self.db.query(Product)
-        
-        # Apply filters
-        if status:
-            query = query.filter(Product.status == status)
-        
-        if category_id:
-            query = query.filter(Product.category_id == category_id)
-        
-        if search:
-            query = query.filter(
-                or_(
-                    Product.name.ilike(f"%{search}%"),
-                    Product.description.ilike(f"%{search}%")
-                )
-            )
+        query = self._build_products_query(status, category_id, search, search_mode)
         
         # Get total count
-        total = query.count()
+        count_key = self._count_cache_key(status, category_id, search, search_mode)
+        total = self.cache.get_cached_data(count_key)
+        if total is None:
+            total = query.count()
+            self.cache.set_cached_data(
+                count_key, total, settings.COUNT_CACHE_TTL, tag=self._COUNT_CACHE_TAG
+            )
         
         # Apply pagination
         offset = (page - 1) * page_size
@@ -111,6 +219,102 @@ class ProductService:
         
         return products, total
     
+    def get_products_after(
+        self,
+        after_id: Optional[int] = None,
+        page_size: int = 20,
+        status: Optional[str] = None,
+        category_id: Optional[int] = None,
+        search: Optional[str] = None,
+        search_mode: ProductSearchMode = "substring"
+    ) -> Tuple[List[Product], bool]:
+        """
+        Get a page of products using keyset (cursor) pagination
+        
+        Args:
+            after_id: ID of the last product on the previous page
+            page_size: Items per page
+            status: Filter by status
+            category_id: Filter by category
+            search: Search in name or description
+            search_mode: "substring" (name or description) or "prefix" (name)
+            
+        Returns:
+            Tuple of (products list, whether a next page exists)
+        """
+        query = self._build_products_query(status, category_id, search, search_mode)
+        
+        if after_id is not None:
+            query = query.filter(Product.id > after_id)
+        
+        # Fetch one extra row to know if there is a next page
+        products = query.order_by(Product.id).limit(page_size + 1).all()
+        
+        return products[:page_size], len(products) > page_size
+    
+    def iter_products(
+        self,
+        status: Optional[str] = None,
+        category_id: Optional[int] = None,
+        search: Optional[str] = None,
+        search_mode: ProductSearchMode = "substring",
+        batch_size: int = 100
+    ) -> Iterator[Product]:
+        """
+        Iterate over all matching products without loading them all at once
+        
+        Rows are fetched in batches through a server-side cursor.
+        
+        Args:
+            status: Filter by status
+            category_id: Filter by category
+            search: Search in name or description
+            search_mode: "substring" (name or description) or "prefix" (name)
+            batch_size: Rows fetched per round trip
+            
+        Returns:
+            Iterator of products ordered by ID
+        """
+        query = self._build_products_query(status, category_id, search, search_mode)
+        return iter(query.order_by(Product.id).yield_per(batch_size))
+    
+    def estimate_product_count(self) -> Tuple[int, bool]:
+        """
+        Get the number of products without scanning the table
+        
+        On PostgreSQL this reads the planner estimate from pg_class, which is
+        O(1). The table is resolved with to_regclass, the same way queries
+        resolve it, so a same-named table in another schema is never read.
+        Other databases, and tables that have never been analyzed, fall
+        back to an exact COUNT. Either result is cached with the listing
+        counts, so repeated calls skip the database.
+        
+        Returns:
+            Tuple of (product count, whether the count is an estimate)
+        """
+        cached = self.cache.get_cached_data(self._ESTIMATE_CACHE_KEY)
+        if cached is not None:
+            return cached[0], cached[1]
+        
+        count, estimated = None, False
+        if self.db.get_bind().dialect.name == "postgresql":
+            estimate = self.db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                {"table": Product.__table__.fullname}
+            ).scalar()
+            
+            if estimate is not None and estimate >= 0:
+                count, estimated = estimate, True
+        
+        if count is None:
+            count = self.db.query(Product).count()
+        
+        self.cache.set_cached_data(
+            self._ESTIMATE_CACHE_KEY, [count, estimated], settings.COUNT_CACHE_TTL,
+            tag=self._COUNT_CACHE_TAG
+        )
+        return count, estimated
+    
     def update_product(self, product_id: int, product_data: ProductUpdate) -> Product:
         """
         Update product
@@ -132,24 +336,28 @@ class ProductService:
                 detail="Product not found"
             )
         
-        # Update fields
-        update_data = product_data.model_dump(exclude_unset=True)
+        # Fields sent by the client; all are flat scalars, so they are read
+        # straight off the model instead of building a model_dump dict
+        fields_set = product_data.model_fields_set
         
         # Check if category exists if it's being updated
-        if "category_id" in update_data and update_data["category_id"] is not None:
-            category = self.db.query(Category).filter(Category.id == update_data["category_id"]).first()
-            if not category:
+        if "category_id" in fields_set and product_data.category_id is not None:
+            if not self._category_exists(product_data.category_id):
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Category with id {update_data['category_id']} not found"
+                    detail=f"Category with id {product_data.category_id} not found"
                 )
         
-        for field, value in update_data.items():
-            setattr(product, field, value)
+        # Update fields
+        for field in fields_set:
+            setattr(product, field, getattr(product_data, field))
         
         self.db.commit()
         self.db.refresh(product)
         
+        self.invalidate_product_cache(product_id)
+        self.invalidate_product_counts()
+        
         return product
     
     def delete_product(self, product_id: int) -> bool:
@@ -175,6 +383,9 @@ class ProductService:
         self.db.delete(product)
         self.db.commit()
         
+        self.invalidate_product_cache(product_id)
+        self.invalidate_product_counts()
+        
         return True
     
     def check_stock_availability(self, product_id: int, quantity: int) -> bool:
@@ -205,12 +416,9 @@ class ProductService:
         Returns:
             True if successful
         """
-        product = self.get_product_by_id(product_id)
-        if not product:
-            return False
-        
-        if product.reduce_stock(quantity):
+        if Product.try_reduce_stock(self.db, product_id, quantity):
             self.db.commit()
+            self.invalidate_product_cache(product_id)
             return True
         
         return False
\ No newline at end of file
@@ -1,9 +1,21 @@
-from sqlalchemy.orm import Session
+import hashlib
+import hmac
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from typing import Optional
 from fastapi import HTTPException, status
 from app.models.user import User
+from app.models.order import Order
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_and_update_password, verify_password
+from app.core.cache import redis_cache
+from app.config import settings
+
+
+# Verified against when the email is unknown, so the response time does not
+# tell which emails are registered
+_DUMMY_PASSWORD_HASH = get_password_hash("dummy-password-for-timing")
 
 
 class UserService:
@@ -15,6 +27,38 @@ class UserService:
     
     def __init__(self, db: Session):
         self.db = db
+        self.cache = redis_cache
+    
+    @staticmethod
+    def _login_cache_key(email: str, password: str, hashed_password: str) -> str:
+        # Keyed on the stored hash too, so a password change voids old entries;
+        # HMAC with the app secret keeps the key useless without it
+        digest = hmac.new(
+            settings.SECRET_KEY.encode(),
+            "\0".join((email, password, hashed_password)).encode(),
+            hashlib.sha256
+        ).hexdigest()
+        return f"auth:valid:{digest[:32]}"
+    
+    @staticmethod
+    def _login_failures_key(email: str, client_ip: str) -> str:
+        return f"auth:fail:{client_ip}:{email.lower()}"
+    
+    @staticmethod
+    def _email_filter(email: str):
+        # Matches ix_users_email_lower, whatever casing the client sends
+        return func.lower(User.email) == email.lower()
+    
+    @staticmethod
+    def _is_email_violation(error: IntegrityError) -> bool:
+        """Tell whether a write violated the unique email index"""
+        diag = getattr(error.orig, "diag", None)
+        constraint = getattr(diag, "constraint_name", None)  # PostgreSQL
+        if constraint:
+            return constraint == "ix_users_email_lower"
+        
+        # SQLite: "UNIQUE constraint failed: index 'ix_users_email_lower'"
+        return "ix_users_email_lower" in str(error.orig)
     
     def create_user(self, user_data: UserCreate) -> User:
         """
@@ -29,14 +73,6 @@ class UserService:
         Raises:
             HTTPException: If email already exists
         """
-        # Check if email already exists
-        existing_user = self.db.query(User).filter(User.email == user_data.email).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        
         # Create user
         user = User(
             email=user_data.email,
@@ -46,40 +82,93 @@ class UserService:
             is_admin=False
         )
         
+        # Email uniqueness (in any casing) is left to the unique index,
+        # so registration is a single INSERT with no pre-check query
         self.db.add(user)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            if not self._is_email_violation(e):
+                raise
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            ) from None
         self.db.refresh(user)
         
         return user
     
-    def authenticate_user(self, email: str, password: str) -> Optional[User]:
+    def authenticate_user(
+        self, email: str, password: str, client_ip: Optional[str] = None
+    ) -> Optional[User]:
         """
         Authenticate user with email and password
         
+        The password hash is deliberately slow, so it is skipped when the
+        answer is already known: credentials checked moments ago (either way)
+        and clients with LOGIN_MAX_FAILURES recent failures for this email,
+        which are refused until LOGIN_FAILURE_WINDOW passes without one.
+        Failures are counted per (email, client IP), so failed attempts from
+        one client never lock the account for others. Unknown emails still
+        pay for a hash check, so timing does not reveal registered emails.
+        
         Args:
             email: User email
             password: Plain password
+            client_ip: Client address the attempt came from; without it
+                failures are not throttled
             
         Returns:
             User if authenticated, None otherwise
         """
-        user = self.db.query(User).filter(User.email == email).first()
+        failures_key = self._login_failures_key(email, client_ip) if client_ip else None
+        if failures_key and self.cache.get_counter(failures_key) >= settings.LOGIN_MAX_FAILURES:
+            return None
+        
+        user = self.db.query(User).filter(self._email_filter(email)).first()
         
         if not user:
+            verify_password(password, _DUMMY_PASSWORD_HASH)
+            if failures_key:
+                self.cache.increment_counter(failures_key, settings.LOGIN_FAILURE_WINDOW)
+            return None
+        
+        # Identical credentials verified moments ago skip the password hash;
+        # 0 marks a recent failure
+        cache_key = self._login_cache_key(email, password, user.hashed_password)
+        cached = self.cache.get_cached_data(cache_key)
+        if cached == user.id:
+            return user
+        if cached == 0:
             return None
         
-        if not verify_password(password, user.hashed_password):
+        is_valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not is_valid:
+            self.cache.set_cached_data(cache_key, 0, settings.LOGIN_FAIL_CACHE_TTL)
+            if failures_key:
+                self.cache.increment_counter(failures_key, settings.LOGIN_FAILURE_WINDOW)
             return None
         
+        # Upgrade outdated hashes (e.g. bcrypt) to the current scheme
+        if new_hash:
+            user.hashed_password = new_hash
+            self.db.commit()
+            cache_key = self._login_cache_key(email, password, new_hash)
+        
+        self.cache.set_cached_data(cache_key, user.id, settings.LOGIN_CACHE_TTL)
+        if failures_key:
+            self.cache.delete_cached_data(failures_key)
+        
         return user
     
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID"""
-        return self.db.query(User).filter(User.id == user_id).first()
+        return self.db.get(User, user_id)
     
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
-        return self.db.query(User).filter(User.email == email).first()
+        return self.db.query(User).filter(self._email_filter(email)).first()
     
     def update_user(self, user_id: int, user_data: UserUpdate) -> User:
         """
@@ -123,4 +212,7 @@ class UserService:
                 detail="User not found"
             )
         
-        return user.orders
\ No newline at end of file
+        # Load the orders with their items in two queries instead of 1 + N
+        return self.db.query(Order).options(
+            selectinload(Order.order_items)
+        ).filter(Order.user_id == user_id).order_by(Order.id).all()
\ No newline at end of file
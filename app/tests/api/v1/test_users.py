@@ -1,14 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
-from app.main import app
 from app.models.user import User
 from app.core.security import create_access_token
 
-client = TestClient(app)
 
-
-def test_get_current_user_info_unauthenticated(db: Session):
+def test_get_current_user_info_unauthenticated(client: TestClient, db: Session):
     """
     Test that an unauthenticated user cannot access the /me endpoint
     """
@@ -17,7 +14,7 @@ def test_get_current_user_info_unauthenticated(db: Session):
     assert response.json() == {"detail": "Not authenticated"}
 
 
-def test_get_current_user_info_authenticated(db: Session, test_user: User):
+def test_get_current_user_info_authenticated(client: TestClient, db: Session, test_user: User):
     """
     Test that an authenticated user can access the /me endpoint
     """
@@ -0,0 +1,140 @@
+import os
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool, StaticPool
+from app.config import settings
+from app.core import cache
+from app.core.security import create_access_token, get_password_hash
+from app.database import Base, SessionLocal
+from app.main import app
+from app.models.user import User
+from app.utils import dfs
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite://")
+
+
+def _create_test_engine():
+    """
+    One engine (and pool) for the whole test session
+
+    In-memory SQLite lives in a single connection, so it is shared across
+    the TestClient worker threads with StaticPool. Other databases get a
+    fixed-size pool that is checked once here instead of pinged on every
+    checkout.
+    """
+    if TEST_DATABASE_URL.startswith("sqlite"):
+        return create_engine(
+            TEST_DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+
+    test_engine = create_engine(
+        TEST_DATABASE_URL,
+        poolclass=QueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=False
+    )
+    with test_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return test_engine
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """Test engine with the schema created; every app session is bound to it"""
+    test_engine = _create_test_engine()
+    Base.metadata.create_all(bind=test_engine)
+
+    # SessionScoped (get_db) and the background jobs all build sessions
+    # from SessionLocal, so rebinding it covers every code path
+    SessionLocal.configure(bind=test_engine)
+
+    yield test_engine
+
+    Base.metadata.drop_all(bind=test_engine)
+    test_engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def redis_client(monkeypatch):
+    """In-memory Redis for each test, so cache logic runs without a server and never leaks between tests"""
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(cache, "redis_client", client)
+    return client
+
+
+@pytest.fixture(scope="session")
+def client(engine):
+    """TestClient shared by the whole session, so app startup runs once"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(engine):
+    """Database session for a test; all rows are removed afterwards"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(table.delete())
+        # IDs are reused by the next test, so per-ID lookups must not survive
+        dfs._path_cache.clear()
+        dfs._descendants_cache.clear()
+
+
+@pytest.fixture
+def test_user(db: Session) -> User:
+    """Active, non-admin user"""
+    user = User(
+        email="test@example.com",
+        hashed_password=get_password_hash("Password1"),
+        full_name="Test User",
+        is_active=True,
+        is_admin=False
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def admin_user(db: Session) -> User:
+    """Active admin user"""
+    user = User(
+        email="admin@example.com",
+        hashed_password=get_password_hash("Password1"),
+        full_name="Admin User",
+        is_active=True,
+        is_admin=True
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _auth_headers(user: User) -> dict:
+    access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+@pytest.fixture
+def auth_headers(test_user: User) -> dict:
+    """Bearer headers for test_user"""
+    return _auth_headers(test_user)
+
+
+@pytest.fixture
+def admin_headers(admin_user: User) -> dict:
+    """Bearer headers for admin_user"""
+    return _auth_headers(admin_user)
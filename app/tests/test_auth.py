@@ -0,0 +1,282 @@
+import base64
+import json
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core import security
+from app.core.security import create_access_token, decode_access_token
+from app.models.user import User
+from app.services import user_service
+from app.services.user_service import UserService
+
+
+def _segment(data) -> str:
+    """Base64url-encode a JSON value (or raw bytes) as a JWT segment"""
+    raw = data if isinstance(data, bytes) else json.dumps(data).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _signed_token(header, payload) -> str:
+    """Build a token with a valid HS256 signature over arbitrary segments"""
+    signing_input = f"{_segment(header)}.{_segment(payload)}"
+    signature = security._hs256_signature(signing_input.encode())
+    return f"{signing_input}.{_segment(signature)}"
+
+
+def _assert_unauthorized(token: str):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_access_token(token)
+    assert exc_info.value.status_code == 401
+
+
+def test_access_token_round_trip():
+    """
+    Test that a token from create_access_token decodes to its claims
+    """
+    token = create_access_token(data={"sub": "42", "email": "user@example.com"})
+    payload = decode_access_token(token)
+    assert payload["sub"] == "42"
+    assert payload["email"] == "user@example.com"
+    assert payload["exp"] > time.time()
+
+
+def test_tampered_payload_is_rejected():
+    """
+    Test that changing the claims invalidates the signature
+    """
+    header, _, signature = create_access_token(data={"sub": "42"}).split(".")
+    forged_payload = _segment({"sub": "1", "exp": int(time.time()) + 3600})
+    _assert_unauthorized(f"{header}.{forged_payload}.{signature}")
+
+
+def test_tampered_signature_is_rejected():
+    """
+    Test that a modified signature is rejected
+    """
+    header, payload, signature = create_access_token(data={"sub": "42"}).split(".")
+    flipped = ("A" if signature[0] != "A" else "B") + signature[1:]
+    _assert_unauthorized(f"{header}.{payload}.{flipped}")
+
+
+def test_token_signed_with_other_key_is_rejected():
+    """
+    Test that a token signed with a different secret is rejected
+    """
+    token = jwt.encode(
+        {"sub": "42", "exp": int(time.time()) + 3600}, settings.SECRET_KEY + "-other", algorithm="HS256"
+    )
+    _assert_unauthorized(token)
+
+
+@pytest.mark.parametrize("alg", ["none", "None", "HS512", "RS256", None])
+def test_non_hs256_header_is_rejected(alg):
+    """
+    Test that only HS256 headers are accepted, even with a valid HS256 signature
+    """
+    header = {"typ": "JWT"} if alg is None else {"alg": alg, "typ": "JWT"}
+    payload = {"sub": "42", "exp": int(time.time()) + 3600}
+    _assert_unauthorized(_signed_token(header, payload))
+    _assert_unauthorized(f"{_segment(header)}.{_segment(payload)}.")
+
+
+@pytest.mark.parametrize("token", [
+    "",
+    "not-a-token",
+    "only.two",
+    "too.many.parts.here",
+    "!!!.@@@.###",
+    f"{_segment(b'not json')}.{_segment({'sub': '42'})}.sig",
+    f"{_segment([1, 2])}.{_segment({'sub': '42'})}.sig",
+    "é.é.é",
+])
+def test_malformed_token_is_rejected(token):
+    """
+    Test that malformed segments give 401 rather than a server error
+    """
+    _assert_unauthorized(token)
+
+
+@pytest.mark.parametrize("payload", [b"not json", b"\xff\xfe", [1, 2], "sub", 42])
+def test_signed_non_object_payload_is_rejected(payload):
+    """
+    Test that a correctly signed token whose payload is not a JSON object is rejected
+    """
+    _assert_unauthorized(_signed_token({"alg": "HS256", "typ": "JWT"}, payload))
+
+
+def test_expired_token_is_rejected():
+    """
+    Test that a token past its exp claim is rejected
+    """
+    _assert_unauthorized(create_access_token(data={"sub": "42"}, expires_delta=timedelta(seconds=-10)))
+
+
+def test_memoized_token_is_rejected_after_expiry(monkeypatch):
+    """
+    Test that a payload memoized by _verify_token does not outlive the token
+    """
+    token = create_access_token(data={"sub": "42"}, expires_delta=timedelta(minutes=5))
+    exp = decode_access_token(token)["exp"]
+    assert security._verify_token.cache_info().currsize > 0
+
+    monkeypatch.setattr(security, "time", SimpleNamespace(time=lambda: exp + 1))
+    _assert_unauthorized(token)
+
+
+def test_python_jose_token_still_decodes():
+    """
+    Test that tokens minted by python-jose (before the built-in signer) are accepted
+    """
+    expire = datetime.utcnow() + timedelta(minutes=5)
+    token = jwt.encode(
+        {"sub": "42", "email": "user@example.com", "exp": expire}, settings.SECRET_KEY, algorithm="HS256"
+    )
+    payload = decode_access_token(token)
+    assert payload["sub"] == "42"
+    assert payload["email"] == "user@example.com"
+
+
+def test_built_in_token_decodes_with_python_jose():
+    """
+    Test that tokens from create_access_token remain standard HS256 JWTs
+    """
+    token = create_access_token(data={"sub": "42"})
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    assert payload["sub"] == "42"
+
+
+def test_malformed_token_on_endpoint_returns_401(client: TestClient):
+    """
+    Test that a malformed bearer token is answered with 401 by a protected endpoint
+    """
+    response = client.get("/api/v1/users/me", headers={"Authorization": "Bearer a.b"})
+    assert response.status_code == 401
+
+
+@pytest.fixture
+def password_checks(monkeypatch):
+    """Record every password hash verification made by UserService"""
+    calls = []
+
+    def verify_and_update_password(password, hashed_password):
+        calls.append(hashed_password)
+        return security.verify_and_update_password(password, hashed_password)
+
+    def verify_password(password, hashed_password):
+        calls.append(hashed_password)
+        return security.verify_password(password, hashed_password)
+
+    monkeypatch.setattr(user_service, "verify_and_update_password", verify_and_update_password)
+    monkeypatch.setattr(user_service, "verify_password", verify_password)
+    return calls
+
+
+def _fail_logins(service: UserService, email: str, client_ip: str, count: int):
+    # Distinct wrong passwords, so none is answered by the negative cache
+    for attempt in range(count):
+        assert service.authenticate_user(email, f"Wrong{attempt}pass", client_ip) is None
+
+
+def test_login_locks_out_client_after_max_failures(db: Session, test_user: User):
+    """
+    Test that a client is refused after LOGIN_MAX_FAILURES, even with the correct password
+    """
+    service = UserService(db)
+    _fail_logins(service, test_user.email, "10.0.0.1", settings.LOGIN_MAX_FAILURES)
+
+    assert service.authenticate_user(test_user.email, "Password1", "10.0.0.1") is None
+
+
+def test_login_lockout_does_not_affect_other_clients(db: Session, test_user: User):
+    """
+    Test that failures from one client never refuse the correct password from another
+    """
+    service = UserService(db)
+    _fail_logins(service, test_user.email, "10.0.0.1", settings.LOGIN_MAX_FAILURES + 5)
+
+    assert service.authenticate_user(test_user.email, "Password1", "10.0.0.2") == test_user
+    assert service.authenticate_user(test_user.email.upper(), "Password1", "10.0.0.2") == test_user
+
+
+def test_login_failures_are_counted_per_email(db: Session, test_user: User):
+    """
+    Test that a client locked out for one email can still log in to another
+    """
+    service = UserService(db)
+    _fail_logins(service, "someone@example.com", "10.0.0.1", settings.LOGIN_MAX_FAILURES)
+
+    assert service.authenticate_user(test_user.email, "Password1", "10.0.0.1") == test_user
+
+
+def test_successful_login_resets_failures(db: Session, test_user: User):
+    """
+    Test that a successful login clears the client's failure count
+    """
+    service = UserService(db)
+    _fail_logins(service, test_user.email, "10.0.0.1", settings.LOGIN_MAX_FAILURES - 1)
+    assert service.authenticate_user(test_user.email, "Password1", "10.0.0.1") == test_user
+
+    _fail_logins(service, test_user.email, "10.0.0.1", settings.LOGIN_MAX_FAILURES - 1)
+    assert service.authenticate_user(test_user.email, "Password1", "10.0.0.1") == test_user
+
+
+def test_repeated_wrong_password_is_answered_from_cache(
+    db: Session, test_user: User, password_checks, redis_client
+):
+    """
+    Test that the same wrong password is hashed once and then refused from the short negative cache
+    """
+    service = UserService(db)
+    assert service.authenticate_user(test_user.email, "Wrong1pass", "10.0.0.1") is None
+    assert service.authenticate_user(test_user.email, "Wrong1pass", "10.0.0.1") is None
+
+    assert len(password_checks) == 1
+    negative_keys = [key for key in redis_client.keys("auth:valid:*") if redis_client.get(key) is not None]
+    assert len(negative_keys) == 1
+    assert 0 < redis_client.ttl(negative_keys[0]) <= settings.LOGIN_FAIL_CACHE_TTL
+
+    # Once the entry expires the password is checked again
+    redis_client.delete(*negative_keys)
+    assert service.authenticate_user(test_user.email, "Wrong1pass", "10.0.0.1") is None
+    assert len(password_checks) == 2
+
+
+def test_correct_password_after_failure_is_not_cached_as_failure(db: Session, test_user: User):
+    """
+    Test that the negative cache only covers the exact wrong password
+    """
+    service = UserService(db)
+    assert service.authenticate_user(test_user.email, "Wrong1pass", "10.0.0.1") is None
+    assert service.authenticate_user(test_user.email, "Password1", "10.0.0.1") == test_user
+
+
+def test_unknown_email_hashes_against_dummy(db: Session, password_checks, redis_client):
+    """
+    Test that an unknown email still pays for a hash check and counts as a failure
+    """
+    service = UserService(db)
+
+    assert service.authenticate_user("nobody@example.com", "Password1", "10.0.0.1") is None
+
+    assert password_checks == [user_service._DUMMY_PASSWORD_HASH]
+    assert user_service._DUMMY_PASSWORD_HASH.startswith("$argon2id$")
+    assert redis_client.get("auth:fail:10.0.0.1:nobody@example.com") == b"1"
+
+
+def test_login_endpoint_throttles_by_client(client: TestClient, db: Session, test_user: User):
+    """
+    Test that the login endpoint passes the client address, so its failures lock that client out
+    """
+    for attempt in range(settings.LOGIN_MAX_FAILURES):
+        response = client.post("/api/v1/auth/login", json={"email": test_user.email, "password": f"Wrong{attempt}pass"})
+        assert response.status_code == 401
+
+    response = client.post("/api/v1/auth/login", json={"email": test_user.email, "password": "Password1"})
+    assert response.status_code == 401
+    assert UserService(db).authenticate_user(test_user.email, "Password1", "10.0.0.2") == test_user
@@ -0,0 +1,256 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.cache import redis_cache
+from app.database import SessionLocal
+from app.models.category import Category
+from app.schemas.category import CategoryCreate
+from app.services.category_service import CategoryService
+from app.utils.dfs import CategoryTree
+
+
+@pytest.fixture
+def category(db: Session) -> Category:
+    """Root category"""
+    category = Category(name="Electronics", slug="electronics")
+    db.add(category)
+    db.commit()
+    db.refresh(category)
+    return category
+
+
+def test_tree_rebuild_racing_a_write_is_not_cached(db: Session, category: Category, monkeypatch, redis_client):
+    """
+    Test that a tree read before a concurrent write is returned but never cached
+    """
+    service = CategoryService(db)
+    build_category_tree = service.build_category_tree
+
+    def build_then_write(*args, **kwargs):
+        tree = build_category_tree(*args, **kwargs)
+        # Another worker creates a category after the tree was read
+        other_db = SessionLocal()
+        try:
+            CategoryService(other_db).create_category(CategoryCreate(name="Phones"))
+        finally:
+            other_db.close()
+        return tree
+
+    monkeypatch.setattr(service, "build_category_tree", build_then_write)
+    stale = service._rebuild_tree_cache()
+
+    assert b"Phones" not in stale
+    assert redis_client.get(service.tree_cache_key) is None
+    assert CategoryService(db).get_category_tree_json().count(b'"name":"Phones"') == 1
+
+
+def test_tree_rebuild_without_writes_is_cached(db: Session, category: Category, redis_client):
+    """
+    Test that a rebuild with no concurrent write stores the tree as fresh
+    """
+    service = CategoryService(db)
+    payload = service.get_category_tree_json()
+
+    assert redis_client.get(service.tree_cache_key) == payload
+    assert redis_client.exists(f"{service.tree_cache_key}:fresh")
+
+
+def test_tree_miss_keeps_another_workers_lock(db: Session, category: Category, redis_client):
+    """
+    Test that rebuilding on a cache miss does not release a lock it never took
+    """
+    service = CategoryService(db)
+    assert redis_cache.acquire_lock(service.tree_lock_key)
+
+    service.get_category_tree_json()
+
+    assert redis_client.exists(service.tree_lock_key)
+
+
+def test_stale_tree_refresh_releases_its_lock(db: Session, category: Category, redis_client):
+    """
+    Test that the worker refreshing a stale tree releases the lock it acquired
+    """
+    service = CategoryService(db)
+    service.get_category_tree_json()
+    redis_client.delete(f"{service.tree_cache_key}:fresh")
+
+    service.get_category_tree_json()
+
+    assert not redis_client.exists(service.tree_lock_key)
+    assert redis_client.exists(f"{service.tree_cache_key}:fresh")
+
+
+def test_tag_ttl_is_only_extended(redis_client):
+    """
+    Test that a shorter-lived entry does not shorten its tag's TTL
+    """
+    redis_cache.set_cached_data("long", 1, ttl=1000, tag="tag")
+    redis_cache.set_cached_data("short", 2, ttl=10, tag="tag")
+
+    assert redis_client.ttl("tag") > 900
+
+    redis_cache.set_cached_data("longer", 3, ttl=2000, tag="tag")
+    assert redis_client.ttl("tag") > 1900
+
+
+def test_tag_outlives_stale_while_revalidate_entry(db: Session, category: Category, redis_client):
+    """
+    Test that the category tag lives as long as the tree, even after a shorter list entry is cached
+    """
+    service = CategoryService(db)
+    service.get_category_tree_json()
+    service.get_all_categories()
+
+    assert redis_client.ttl(service.cache_tag) > settings.CACHE_TTL
+
+
+def test_invalidation_removes_tree_and_fresh_marker(db: Session, category: Category, redis_client):
+    """
+    Test that invalidating the tag drops the tree, its freshness marker and the list
+    """
+    service = CategoryService(db)
+    service.get_category_tree_json()
+    service.get_all_categories()
+
+    service.invalidate_category_tree_cache()
+
+    assert not redis_client.exists(
+        service.tree_cache_key, f"{service.tree_cache_key}:fresh", service.all_cache_key
+    )
+
+
+def test_category_write_is_visible_on_next_read(
+    client: TestClient, db: Session, category: Category, admin_headers: dict
+):
+    """
+    Test that an admin reading right after a write gets the new data
+    """
+    assert client.get("/api/v1/categories/tree").json()[0]["name"] == "Electronics"
+    assert client.get("/api/v1/categories/").json()[0]["name"] == "Electronics"
+
+    response = client.put(
+        f"/api/v1/categories/{category.id}", json={"name": "Gadgets"}, headers=admin_headers
+    )
+    assert response.status_code == 200
+
+    assert client.get("/api/v1/categories/tree").json()[0]["name"] == "Gadgets"
+    assert client.get("/api/v1/categories/").json()[0]["name"] == "Gadgets"
+
+
+@pytest.fixture
+def category_chain(db: Session, category: Category) -> list:
+    """Electronics > Phones > Android, as IDs from the root down"""
+    phones = Category(name="Phones", slug="phones", parent_id=category.id)
+    db.add(phones)
+    db.commit()
+    android = Category(name="Android", slug="android", parent_id=phones.id)
+    db.add(android)
+    db.commit()
+    return [category.id, phones.id, android.id]
+
+
+def test_update_category_rejects_itself_as_parent(
+    client: TestClient, db: Session, category: Category, admin_headers: dict
+):
+    """
+    Test that a category cannot be made its own parent
+    """
+    response = client.put(
+        f"/api/v1/categories/{category.id}", json={"name": "Electronics", "parent_id": category.id}, headers=admin_headers
+    )
+
+    assert response.status_code == 400
+    db.expire_all()
+    assert db.get(Category, category.id).parent_id is None
+
+
+@pytest.mark.parametrize("descendant", [1, 2])
+def test_update_category_rejects_descendant_as_parent(
+    client: TestClient, db: Session, category_chain: list, admin_headers: dict, descendant: int
+):
+    """
+    Test that a category cannot be moved under its child or grandchild
+    """
+    root_id = category_chain[0]
+    # Warm the in-process lookup, so a stale entry would be noticed
+    CategoryTree._get_descendants_dfs(db, root_id)
+
+    response = client.put(
+        f"/api/v1/categories/{root_id}", json={"name": "Electronics", "parent_id": category_chain[descendant]}, headers=admin_headers
+    )
+
+    assert response.status_code == 400
+    db.expire_all()
+    assert db.get(Category, root_id).parent_id is None
+
+
+def test_update_category_moves_under_unrelated_category(
+    client: TestClient, db: Session, category_chain: list, admin_headers: dict
+):
+    """
+    Test that moving a subtree under another branch is still allowed
+    """
+    other = Category(name="Books", slug="books")
+    db.add(other)
+    db.commit()
+
+    response = client.put(
+        f"/api/v1/categories/{category_chain[1]}", json={"name": "Phones", "parent_id": other.id}, headers=admin_headers
+    )
+
+    assert response.status_code == 200
+    assert [node["id"] for node in CategoryTree.get_category_path(db, category_chain[2])] == [
+        other.id, category_chain[1], category_chain[2]
+    ]
+
+
+def test_category_path_is_root_first(db: Session, category_chain: list):
+    """
+    Test that the path lists the root first and ends with the category
+    """
+    path = CategoryTree.get_category_path(db, category_chain[2])
+
+    assert [node["id"] for node in path] == category_chain
+    assert [node["slug"] for node in path] == ["electronics", "phones", "android"]
+    assert CategoryTree.get_category_path(db, category_chain[2] + 100) == []
+
+
+def test_lookups_terminate_on_parent_cycle(db: Session, category_chain: list):
+    """
+    Test that a parent cycle written outside CategoryService does not make the recursive queries loop
+    """
+    root_id, phones_id, android_id = category_chain
+    db.get(Category, root_id).parent_id = android_id
+    db.commit()
+
+    assert sorted(CategoryTree._load_descendants(db, root_id)) == sorted(category_chain)
+    assert [node["id"] for node in CategoryTree._load_category_path(db, phones_id)] == [
+        android_id, root_id, phones_id
+    ]
+
+
+def test_related_categories(db: Session, category_chain: list):
+    """
+    Test that related categories are the category, its siblings and all its descendants
+    """
+    root_id, phones_id, android_id = category_chain
+    laptops = Category(name="Laptops", slug="laptops", parent_id=root_id)
+    db.add(laptops)
+    db.commit()
+
+    assert sorted(CategoryTree.get_related_categories(db, phones_id)) == [phones_id, android_id, laptops.id]
+    assert sorted(CategoryTree.get_related_categories(db, root_id)) == sorted(category_chain + [laptops.id])
+    assert CategoryTree.get_related_categories(db, android_id + 100) == []
+
+
+def test_related_categories_terminate_on_parent_cycle(db: Session, category_chain: list):
+    """
+    Test that a parent cycle written outside CategoryService does not make the subtree query loop
+    """
+    root_id, phones_id, android_id = category_chain
+    db.get(Category, root_id).parent_id = android_id
+    db.commit()
+
+    assert sorted(CategoryTree.get_related_categories(db, root_id)) == sorted(category_chain)
@@ -0,0 +1,254 @@
+from decimal import Decimal
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.order_service import OrderService
+
+ORDERS_URL = "/api/v1/orders/"
+
+
+@pytest.fixture
+def make_product(db: Session):
+    """Factory for an active product"""
+    counter = iter(range(1, 1000))
+
+    def _make_product(price: str = "10.00", stock: int = 5) -> Product:
+        number = next(counter)
+        product = Product(name=f"Product {number}", sku=f"SKU-{number}", price=Decimal(price), stock=stock)
+        db.add(product)
+        db.commit()
+        return product
+
+    return _make_product
+
+
+def _order_data(*lines) -> OrderCreate:
+    return OrderCreate(items=[OrderItemCreate(product_id=product_id, quantity=quantity) for product_id, quantity in lines])
+
+
+def _stock(db: Session, product: Product) -> int:
+    db.expire_all()
+    return db.get(Product, product.id).stock
+
+
+def test_create_order_inserts_items_with_final_total(
+    client: TestClient, db: Session, make_product, auth_headers: dict
+):
+    """
+    Test that an order is created pending with every item and its final total, without touching stock
+    """
+    phone = make_product(price="199.99", stock=5)
+    cable = make_product(price="5.50", stock=10)
+
+    response = client.post(ORDERS_URL, json={"items": [
+        {"product_id": phone.id, "quantity": 2},
+        {"product_id": cable.id, "quantity": 3},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 201
+    order = response.json()
+    assert order["status"] == OrderStatus.PENDING.value
+    assert Decimal(order["total_amount"]) == Decimal("416.48")
+    items = sorted(order["order_items"], key=lambda item: item["product_id"])
+    assert [(item["product_id"], item["quantity"], Decimal(item["subtotal"])) for item in items] == [
+        (phone.id, 2, Decimal("399.98")),
+        (cable.id, 3, Decimal("16.50")),
+    ]
+    assert Decimal(db.get(Order, order["id"]).total_amount) == Decimal("416.48")
+    assert _stock(db, phone) == 5
+
+
+def test_create_order_checks_summed_quantity_per_product(
+    client: TestClient, db: Session, make_product, auth_headers: dict
+):
+    """
+    Test that two lines of 3 against a stock of 5 are refused, although each line alone fits
+    """
+    product = make_product(stock=5)
+
+    response = client.post(ORDERS_URL, json={"items": [
+        {"product_id": product.id, "quantity": 3},
+        {"product_id": product.id, "quantity": 3},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert db.query(Order).count() == 0
+
+
+def test_create_order_with_repeated_product_within_stock(
+    client: TestClient, db: Session, make_product, auth_headers: dict
+):
+    """
+    Test that repeated lines are accepted when their sum fits the stock
+    """
+    product = make_product(stock=5)
+
+    response = client.post(ORDERS_URL, json={"items": [
+        {"product_id": product.id, "quantity": 3},
+        {"product_id": product.id, "quantity": 2},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 201
+    assert len(response.json()["order_items"]) == 2
+
+
+def test_create_order_with_unknown_product(client: TestClient, db: Session, make_product, auth_headers: dict):
+    """
+    Test that an unknown product is reported as 404 and nothing is written
+    """
+    product = make_product()
+
+    response = client.post(ORDERS_URL, json={"items": [
+        {"product_id": product.id, "quantity": 1},
+        {"product_id": product.id + 100, "quantity": 1},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 404
+    assert db.query(Order).count() == 0
+
+
+def test_mark_order_as_paid_deducts_stock_once(db: Session, test_user: User, make_product):
+    """
+    Test that paying an order reduces stock, and paying it again is refused without deducting twice
+    """
+    phone = make_product(stock=5)
+    cable = make_product(stock=10)
+    service = OrderService(db)
+    order = service.create_order(test_user.id, _order_data((phone.id, 2), (cable.id, 1), (phone.id, 1)))
+
+    paid = service.mark_order_as_paid(order.id)
+
+    assert paid.status == OrderStatus.PAID
+    assert _stock(db, phone) == 2
+    assert _stock(db, cable) == 9
+
+    with pytest.raises(HTTPException) as exc_info:
+        OrderService(db).mark_order_as_paid(order.id)
+    assert exc_info.value.status_code == 400
+    db.rollback()
+    assert _stock(db, phone) == 2
+    assert _stock(db, cable) == 9
+
+
+def test_mark_order_as_paid_after_cancel_is_refused(db: Session, test_user: User, make_product):
+    """
+    Test that a canceled order cannot be paid and keeps its stock
+    """
+    product = make_product(stock=5)
+    service = OrderService(db)
+    order = service.create_order(test_user.id, _order_data((product.id, 2)))
+    service.cancel_order(order.id, test_user.id)
+
+    with pytest.raises(HTTPException) as exc_info:
+        service.mark_order_as_paid(order.id)
+    assert exc_info.value.status_code == 400
+    db.rollback()
+    assert _stock(db, product) == 5
+
+
+def test_mark_order_as_paid_leaves_short_stock_unchanged(db: Session, test_user: User, make_product):
+    """
+    Test that the bulk decrement never drives stock negative when it ran short after ordering
+    """
+    product = make_product(stock=5)
+    service = OrderService(db)
+    order = service.create_order(test_user.id, _order_data((product.id, 4)))
+    db.get(Product, product.id).stock = 3
+    db.commit()
+
+    service.mark_order_as_paid(order.id)
+
+    assert _stock(db, product) == 3
+
+
+def test_mark_orders_as_paid_skips_orders_no_longer_pending(db: Session, test_user: User, make_product):
+    """
+    Test that the batch path pays every pending order once and skips the others
+    """
+    product = make_product(stock=10)
+    service = OrderService(db)
+    first = service.create_order(test_user.id, _order_data((product.id, 2)))
+    second = service.create_order(test_user.id, _order_data((product.id, 3)))
+    canceled = service.create_order(test_user.id, _order_data((product.id, 4)))
+    service.cancel_order(canceled.id, test_user.id)
+
+    marked = service.mark_orders_as_paid([first.id, second.id, canceled.id])
+
+    assert sorted(marked) == sorted([first.id, second.id])
+    assert _stock(db, product) == 5
+    assert OrderService(db).mark_orders_as_paid([first.id, second.id]) == []
+    assert _stock(db, product) == 5
+
+
+@pytest.fixture
+def orders(db: Session, test_user: User, make_product):
+    """Five orders of test_user, oldest first"""
+    product = make_product(stock=100)
+    service = OrderService(db)
+    return [service.create_order(test_user.id, _order_data((product.id, 1))).id for _ in range(5)]
+
+
+def test_orders_cursor_pagination(client: TestClient, db: Session, orders, auth_headers: dict):
+    """
+    Test that following next_cursor walks every order once, newest first
+    """
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"page_size": 2} if cursor is None else {"page_size": 2, "cursor": cursor}
+        response = client.get(ORDERS_URL, params=params, headers=auth_headers)
+        assert response.status_code == 200
+        body = response.json()
+        seen.extend(order["id"] for order in body["items"])
+        pages += 1
+        if not body["has_next"]:
+            assert body["next_cursor"] is None
+            break
+        cursor = body["next_cursor"]
+
+    assert pages == 3
+    assert seen == sorted(orders, reverse=True)
+
+
+def test_orders_cursor_pagination_hides_other_users_orders(
+    client: TestClient, db: Session, orders, admin_headers: dict
+):
+    """
+    Test that a user only pages through their own orders
+    """
+    response = client.get(ORDERS_URL, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+    assert response.json()["has_next"] is False
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "!!!", "YWJj"])
+def test_orders_malformed_cursor(client: TestClient, db: Session, orders, auth_headers: dict, cursor):
+    """
+    Test that a malformed cursor returns 400
+    """
+    response = client.get(ORDERS_URL, params={"cursor": cursor}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_orders_deprecated_page_returns_totals(client: TestClient, db: Session, orders, auth_headers: dict):
+    """
+    Test that the deprecated page parameter still returns totals
+    """
+    response = client.get(ORDERS_URL, params={"page": 3, "page_size": 2}, headers=auth_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 5
+    assert body["total_pages"] == 3
+    assert body["has_next"] is False
+    assert len(body["items"]) == 1
+
+    past_end = client.get(ORDERS_URL, params={"page": 4, "page_size": 2}, headers=auth_headers).json()
+    assert past_end["items"] == []
+    assert past_end["total"] == 5
@@ -0,0 +1,181 @@
+import hashlib
+import hmac
+import json
+import time
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.payment import Payment, PaymentProvider, PaymentStatus
+from app.models.product import Product
+from app.models.user import User
+
+STRIPE_WEBHOOK_URL = "/api/v1/payments/webhooks/stripe"
+BKASH_WEBHOOK_URL = "/api/v1/payments/webhooks/bkash"
+
+
+def _stripe_signature(body: bytes, secret: str = None, timestamp: int = None) -> str:
+    """Build a Stripe-Signature header the way Stripe signs webhooks"""
+    secret = settings.STRIPE_WEBHOOK_SECRET if secret is None else secret
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def _stripe_event(transaction_id: str, event_type: str = "payment_intent.succeeded") -> bytes:
+    return json.dumps({
+        "type": event_type,
+        "data": {"object": {"id": transaction_id, "metadata": {}}}
+    }).encode()
+
+
+@pytest.fixture
+def make_payment(db: Session, test_user: User):
+    """Factory for a pending payment on a pending order of two units of a product"""
+    counter = iter(range(1, 1000))
+
+    def _make_payment(provider: PaymentProvider, transaction_id: str) -> Payment:
+        number = next(counter)
+        product = Product(name=f"Product {number}", sku=f"SKU-{number}", price=Decimal("10.00"), stock=5)
+        order = Order(user_id=test_user.id, total_amount=Decimal("20.00"), status=OrderStatus.PENDING)
+        db.add_all([product, order])
+        db.flush()
+
+        db.add(OrderItem(
+            order_id=order.id, product_id=product.id, quantity=2,
+            price=Decimal("10.00"), subtotal=Decimal("20.00")
+        ))
+        payment = Payment(order_id=order.id, provider=provider, transaction_id=transaction_id)
+        db.add(payment)
+        db.commit()
+        return payment
+
+    return _make_payment
+
+
+def _assert_paid(db: Session, payment: Payment):
+    db.expire_all()
+    assert payment.status == PaymentStatus.SUCCESS
+    order = db.get(Order, payment.order_id)
+    assert order.status == OrderStatus.PAID
+    assert db.get(Product, order.order_items[0].product_id).stock == 3
+
+
+def test_stripe_webhook_with_valid_signature(client: TestClient, db: Session, make_payment):
+    """
+    Test that a correctly signed Stripe webhook marks the payment and order as paid
+    """
+    payment = make_payment(PaymentProvider.STRIPE, "pi_valid")
+    body = _stripe_event("pi_valid")
+
+    response = client.post(STRIPE_WEBHOOK_URL, content=body, headers={"Stripe-Signature": _stripe_signature(body)})
+
+    assert response.status_code == 200
+    assert response.json()["result"]["transaction_id"] == "pi_valid"
+    _assert_paid(db, payment)
+
+
+def test_stripe_webhook_accepts_any_matching_v1_signature(client: TestClient, db: Session):
+    """
+    Test that a header listing several v1 signatures (secret rotation) is accepted
+    """
+    body = _stripe_event("pi_unknown", event_type="charge.refunded")
+    timestamp = int(time.time())
+    valid = _stripe_signature(body, timestamp=timestamp)
+    stale_secret = _stripe_signature(body, secret="whsec_old", timestamp=timestamp).split(",")[1]
+
+    response = client.post(STRIPE_WEBHOOK_URL, content=body, headers={"Stripe-Signature": f"{valid},{stale_secret}"})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("signature", [
+    lambda body: _stripe_signature(body, secret="whsec_wrong"),
+    lambda body: _stripe_signature(body, timestamp=int(time.time()) - 3600),
+    lambda body: _stripe_signature(body, timestamp=int(time.time()) + 3600),
+    lambda body: _stripe_signature(b"{}"),
+    lambda body: "t=abc,v1=deadbeef",
+    lambda body: f"t={int(time.time())}",
+    lambda body: "",
+    lambda body: None,
+], ids=["wrong-secret", "stale", "future", "other-body", "bad-timestamp", "no-v1", "empty", "missing"])
+def test_stripe_webhook_rejects_bad_signature(client: TestClient, db: Session, make_payment, signature):
+    """
+    Test that a wrong, stale or missing Stripe-Signature header returns 400 and changes nothing
+    """
+    payment = make_payment(PaymentProvider.STRIPE, "pi_forged")
+    body = _stripe_event("pi_forged")
+    header = signature(body)
+    headers = {} if header is None else {"Stripe-Signature": header}
+
+    response = client.post(STRIPE_WEBHOOK_URL, content=body, headers=headers)
+
+    assert response.status_code == 400
+    db.expire_all()
+    assert payment.status == PaymentStatus.PENDING
+
+
+@pytest.mark.parametrize("url", [STRIPE_WEBHOOK_URL, BKASH_WEBHOOK_URL])
+def test_webhook_rejects_non_json_body(client: TestClient, db: Session, url):
+    """
+    Test that a body that is not JSON returns 400
+    """
+    body = b"not json"
+    response = client.post(url, content=body, headers={"Stripe-Signature": _stripe_signature(body)})
+    assert response.status_code == 400
+
+
+def test_bkash_webhook_single_event(client: TestClient, db: Session, make_payment):
+    """
+    Test that a single bKash callback goes through handle_webhook and marks the order paid
+    """
+    payment = make_payment(PaymentProvider.BKASH, "TRX-SINGLE")
+
+    response = client.post(BKASH_WEBHOOK_URL, json={"paymentID": "TRX-SINGLE", "status": "success"})
+
+    assert response.status_code == 200
+    assert response.json()["result"]["transaction_id"] == "TRX-SINGLE"
+    _assert_paid(db, payment)
+
+
+def test_bkash_webhook_batch(client: TestClient, db: Session, make_payment):
+    """
+    Test that an array of bKash callbacks goes through handle_webhook_batch
+    """
+    paid = make_payment(PaymentProvider.BKASH, "TRX-PAID")
+    failed = make_payment(PaymentProvider.BKASH, "TRX-FAILED")
+
+    response = client.post(BKASH_WEBHOOK_URL, json=[
+        {"paymentID": "TRX-PAID", "status": "success"},
+        {"paymentID": "TRX-FAILED", "status": "failure"},
+    ])
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["transaction_id"] for result in results] == ["TRX-PAID", "TRX-FAILED"]
+    _assert_paid(db, paid)
+    assert failed.status == PaymentStatus.FAILED
+    assert db.get(Order, failed.order_id).status == OrderStatus.PENDING
+
+
+@pytest.mark.parametrize("payload", [
+    [{"paymentID": "TRX-MIXED", "status": "success"}, "not an object"],
+    [None],
+    [[{"paymentID": "TRX-MIXED"}]],
+    "not an object",
+    42,
+], ids=["mixed-array", "null-element", "nested-array", "string", "number"])
+def test_bkash_webhook_rejects_non_object_events(client: TestClient, db: Session, make_payment, payload):
+    """
+    Test that events which are not JSON objects return 400 and nothing is applied
+    """
+    payment = make_payment(PaymentProvider.BKASH, "TRX-MIXED")
+
+    response = client.post(BKASH_WEBHOOK_URL, json=payload)
+
+    assert response.status_code == 400
+    db.expire_all()
+    assert payment.status == PaymentStatus.PENDING
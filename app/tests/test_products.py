@@ -0,0 +1,138 @@
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.models.product import Product
+
+PRODUCTS_URL = "/api/v1/products/"
+
+
+@pytest.fixture
+def products(db: Session):
+    """Products whose names exercise LIKE wildcards, in ID order"""
+    names = ["50% Off Deal", "500 Deal", "A_B Cable", "AXB Cable", "Bolt"]
+    rows = [
+        Product(name=name, sku=f"SKU-{number}", price=Decimal("10.00"), stock=5)
+        for number, name in enumerate(names, start=1)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return [row.id for row in rows]
+
+
+def _names(response) -> list:
+    assert response.status_code == 200
+    return [product["name"] for product in response.json()["items"]]
+
+
+def test_products_cursor_pagination(client: TestClient, db: Session, products):
+    """
+    Test that following next_cursor walks every product once, in ID order
+    """
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"page_size": 2} if cursor is None else {"page_size": 2, "cursor": cursor}
+        response = client.get(PRODUCTS_URL, params=params)
+        assert response.status_code == 200
+        body = response.json()
+        seen.extend(product["id"] for product in body["items"])
+        pages += 1
+        if not body["has_next"]:
+            assert body["next_cursor"] is None
+            break
+        assert body["next_cursor"]
+        cursor = body["next_cursor"]
+
+    assert pages == 3
+    assert seen == products
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "!!!", "YWJj"])
+def test_products_malformed_cursor(client: TestClient, db: Session, products, cursor):
+    """
+    Test that a malformed cursor returns 400
+    """
+    response = client.get(PRODUCTS_URL, params={"cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_products_deprecated_page_returns_totals(client: TestClient, db: Session, products):
+    """
+    Test that the deprecated page parameter still returns totals
+    """
+    response = client.get(PRODUCTS_URL, params={"page": 3, "page_size": 2})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 5
+    assert body["page"] == 3
+    assert body["total_pages"] == 3
+    assert body["has_next"] is False
+    assert len(body["items"]) == 1
+
+
+@pytest.mark.parametrize("search, expected", [
+    ("50", ["50% Off Deal", "500 Deal"]),
+    ("50%", ["50% Off Deal"]),
+    ("a_", ["A_B Cable"]),
+    ("a", ["A_B Cable", "AXB Cable"]),
+    ("%", []),
+    ("_", []),
+    ("deal", []),
+])
+def test_products_prefix_search_matches_wildcards_literally(client: TestClient, db: Session, products, search, expected):
+    """
+    Test that prefix search matches the start of the name, case-insensitively, with % and _ taken literally
+    """
+    response = client.get(PRODUCTS_URL, params={"search": search, "search_mode": "prefix"})
+    assert _names(response) == expected
+
+
+@pytest.mark.parametrize("search, expected", [
+    ("%", ["50% Off Deal"]),
+    ("_", ["A_B Cable"]),
+    ("deal", ["50% Off Deal", "500 Deal"]),
+])
+def test_products_substring_search_matches_wildcards_literally(client: TestClient, db: Session, products, search, expected):
+    """
+    Test that substring search (the default) takes % and _ literally
+    """
+    response = client.get(PRODUCTS_URL, params={"search": search})
+    assert _names(response) == expected
+
+
+def test_products_search_mode_totals_are_cached_separately(client: TestClient, db: Session, products):
+    """
+    Test that the cached listing total of one search mode is not reused for the other
+    """
+    substring = client.get(PRODUCTS_URL, params={"page": 1, "search": "b"}).json()
+    prefix = client.get(PRODUCTS_URL, params={"page": 1, "search": "b", "search_mode": "prefix"}).json()
+
+    assert substring["total"] == 3
+    assert prefix["total"] == 1
+
+
+def test_products_unknown_search_mode(client: TestClient, db: Session):
+    """
+    Test that an unknown search mode is rejected
+    """
+    response = client.get(PRODUCTS_URL, params={"search": "a", "search_mode": "fuzzy"})
+    assert response.status_code == 422
+
+
+def test_create_product_with_duplicate_sku(client: TestClient, db: Session, products, admin_headers: dict):
+    """
+    Test that a duplicate SKU returns 400 and the existing product is kept
+    """
+    response = client.post(PRODUCTS_URL, json={
+        "name": "Copy", "sku": "SKU-1", "price": "1.00", "stock": 1
+    }, headers=admin_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "SKU already exists"
+    assert db.query(Product).filter(Product.sku == "SKU-1").one().name == "50% Off Deal"
+
+    response = client.post(PRODUCTS_URL, json={
+        "name": "New", "sku": "SKU-NEW", "price": "1.00", "stock": 1
+    }, headers=admin_headers)
+    assert response.status_code == 201
@@ -1,48 +1,109 @@
-from typing import List, Dict, Any, Optional
+import time
+from collections import defaultdict
+from typing import Callable, List, Dict, Any, Optional, Tuple, TypedDict
+from sqlalchemy import select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from app.models.category import Category
-from app.core.cache import cache
+from app.core.cache import redis_cache
+from app.config import settings
+
+# In-process caches for per-category lookups: category_id -> (expires_at, result).
+# Cleared by CategoryTree.invalidate_cache; the TTL bounds staleness in
+# worker processes that did not perform the write.
+_LOOKUP_CACHE_SIZE = 1024
+_path_cache: Dict[int, Tuple[float, tuple]] = {}
+_descendants_cache: Dict[int, Tuple[float, tuple]] = {}
+
+
+def _cached_lookup(cache: Dict[int, Tuple[float, tuple]], category_id: int, load: Callable[[], tuple]) -> tuple:
+    """Return a cached lookup result, loading (and caching) it when missing or expired"""
+    now = time.monotonic()
+    entry = cache.get(category_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    
+    value = load()
+    if len(cache) >= _LOOKUP_CACHE_SIZE:
+        cache.clear()
+    cache[category_id] = (now + settings.CATEGORY_LOOKUP_TTL, value)
+    return value
+
+
+class CategoryNode(TypedDict):
+    """Category tree node, as built by CategoryTree and stored in the cache"""
+    id: int
+    name: str
+    slug: str
+    description: Optional[str]
+    parent_id: Optional[int]
+    children: List["CategoryNode"]
 
 
 class CategoryTree:
     """DFS-based category tree traversal with caching"""
     
     @staticmethod
-    def build_tree(db: Session, use_cache: bool = True) -> List[Dict[str, Any]]:
+    def build_tree(db: Session, use_cache: bool = True) -> List[CategoryNode]:
         """Build complete category tree using DFS traversal"""
         
         # Try to get from cache first
         if use_cache:
-            cached_tree = cache.get("category_tree")
+            cached_tree = redis_cache.get_cached_data("category_tree")
             if cached_tree:
                 return cached_tree
         
-        # Get all categories from database
-        categories = db.query(Category).all()
-        
-        # Build category map for O(1) lookup
-        category_map = {cat.id: cat for cat in categories}
+        # Get all categories from database, as plain rows of the node
+        # columns: no ORM instances to hydrate and track per category
+        categories = db.execute(select(
+            Category.id, Category.name, Category.slug, Category.description, Category.parent_id
+        )).all()
         
-        # Find root categories (no parent)
-        root_categories = [cat for cat in categories if cat.parent_id is None]
+        # Group children by parent in one pass, so each node's children
+        # are a dict lookup instead of a scan over every category
+        children_by_parent: Dict[Optional[int], List[Row]] = defaultdict(list)
+        for cat in categories:
+            children_by_parent[cat.parent_id].append(cat)
         
-        # Build tree using DFS
+        # Build tree using DFS, starting from the root categories (no parent)
         tree = []
-        for root in root_categories:
-            tree.append(CategoryTree._dfs_traverse(root, category_map))
+        for root in children_by_parent.get(None, ()):
+            tree.append(CategoryTree._dfs_traverse(root, children_by_parent))
         
         # Cache the tree
         if use_cache:
-            cache.set("category_tree", tree)
+            redis_cache.set_cached_data("category_tree", tree)
         
         return tree
     
     @staticmethod
-    def _dfs_traverse(category: Category, category_map: Dict[int, Category]) -> Dict[str, Any]:
-        """DFS recursive traversal to build category tree"""
-        
-        # Build current node
-        node = {
+    def _dfs_traverse(
+        category: Row, children_by_parent: Dict[Optional[int], List[Row]]
+    ) -> CategoryNode:
+        """
+        DFS traversal to build category tree
+        
+        Uses an explicit stack rather than recursion, so deep trees neither
+        pay a Python call per node nor hit the recursion limit. A node is
+        attached to its parent when created, which keeps children in order.
+        """
+        
+        root = CategoryTree._build_node(category)
+        stack = [(category, root)]
+        
+        while stack:
+            current, node = stack.pop()
+            for child in children_by_parent.get(current.id, ()):
+                child_node = CategoryTree._build_node(child)
+                node["children"].append(child_node)
+                stack.append((child, child_node))
+        
+        return root
+    
+    @staticmethod
+    def _build_node(category: Row) -> CategoryNode:
+        """Build a tree node (without children) from a row of the node columns"""
+        return {
             "id": category.id,
             "name": category.name,
             "slug": category.slug,
@@ -50,82 +111,104 @@ class CategoryTree:
             "parent_id": category.parent_id,
             "children": []
         }
-        
-        # Find all children
-        children = [cat for cat in category_map.values() if cat.parent_id == category.id]
-        
-        # Recursively traverse children
-        for child in children:
-            node["children"].append(CategoryTree._dfs_traverse(child, category_map))
-        
-        return node
     
     @staticmethod
     def get_category_path(db: Session, category_id: int) -> List[Dict[str, Any]]:
-        """Get path from root to specific category"""
+        """Get path from root to specific category (cached in-process)"""
+        path = _cached_lookup(
+            _path_cache, category_id, lambda: CategoryTree._load_category_path(db, category_id)
+        )
+        # Copies, so callers cannot modify the cached entries
+        return [dict(node) for node in path]
+    
+    @staticmethod
+    def _load_category_path(db: Session, category_id: int) -> tuple:
+        """
+        Load the path from root to a category in one recursive query
+        
+        The CTE uses UNION, so a parent cycle (only possible through writes
+        that bypass CategoryService) ends once every ancestor is found
+        instead of recursing forever. There is no depth column to dedupe
+        on, so the rows are put in root-first order by following parent_id.
+        """
+        
+        # Walk up the parent chain in one recursive query instead of one per level
+        ancestors = select(
+            Category.id, Category.name, Category.slug, Category.parent_id
+        ).where(Category.id == category_id).cte("ancestors", recursive=True)
+        ancestors = ancestors.union(
+            select(
+                Category.id, Category.name, Category.slug, Category.parent_id
+            ).join(ancestors, Category.id == ancestors.c.parent_id)
+        )
+        
+        by_id = {row.id: row for row in db.execute(select(ancestors)).all()}
         
         path = []
-        current_category = db.query(Category).filter(Category.id == category_id).first()
-        
-        if not current_category:
-            return path
-        
-        # Traverse up to root
-        while current_category:
-            path.insert(0, {
-                "id": current_category.id,
-                "name": current_category.name,
-                "slug": current_category.slug
-            })
-            
-            if current_category.parent_id:
-                current_category = db.query(Category).filter(
-                    Category.id == current_category.parent_id
-                ).first()
-            else:
-                break
-        
-        return path
+        current = by_id.get(category_id)
+        # Each ancestor is visited once, even if the chain loops back
+        while current is not None and len(path) < len(by_id):
+            path.append({"id": current.id, "name": current.name, "slug": current.slug})
+            current = by_id.get(current.parent_id)
+        
+        return tuple(reversed(path))
     
     @staticmethod
     def get_related_categories(db: Session, category_id: int) -> List[int]:
-        """Get all related category IDs (siblings and children) using DFS"""
-        
-        category = db.query(Category).filter(Category.id == category_id).first()
-        if not category:
-            return []
-        
-        related_ids = [category_id]
-        
-        # Get siblings (same parent)
-        if category.parent_id:
-            siblings = db.query(Category).filter(
-                Category.parent_id == category.parent_id,
-                Category.id != category_id
-            ).all()
-            related_ids.extend([sib.id for sib in siblings])
-        
-        # Get all descendants using DFS
-        descendants = CategoryTree._get_descendants_dfs(db, category_id)
-        related_ids.extend(descendants)
-        
-        return list(set(related_ids))
+        """
+        Get all related category IDs (the category itself, its siblings and
+        all descendants) in one query
+        
+        A recursive CTE walks the subtree from the category, and a UNION adds
+        the categories sharing its parent; root categories have no siblings.
+        The CTE recurses with UNION too, so a parent cycle cannot make it
+        loop. An unknown ID yields an empty list.
+        """
+        
+        subtree = select(Category.id).where(
+            Category.id == category_id
+        ).cte("subtree", recursive=True)
+        subtree = subtree.union(
+            select(Category.id).join(subtree, Category.parent_id == subtree.c.id)
+        )
+        
+        parent_id = select(Category.parent_id).where(Category.id == category_id).scalar_subquery()
+        siblings = select(Category.id).where(Category.parent_id == parent_id)
+        
+        # UNION (not UNION ALL) also removes duplicates
+        return list(db.execute(select(subtree.c.id).union(siblings)).scalars())
     
     @staticmethod
     def _get_descendants_dfs(db: Session, category_id: int) -> List[int]:
-        """Get all descendant category IDs using DFS"""
-        
-        descendants = []
-        children = db.query(Category).filter(Category.parent_id == category_id).all()
-        
-        for child in children:
-            descendants.append(child.id)
-            # Recursive DFS
-            descendants.extend(CategoryTree._get_descendants_dfs(db, child.id))
-        
-        return descendants
+        """Get all descendant category IDs (cached in-process)"""
+        return list(_cached_lookup(
+            _descendants_cache, category_id, lambda: CategoryTree._load_descendants(db, category_id)
+        ))
+    
+    @staticmethod
+    def _load_descendants(db: Session, category_id: int) -> tuple:
+        """
+        Load all descendant category IDs in one recursive query
+        
+        UNION rather than UNION ALL, so a parent cycle ends the recursion
+        once every category in it has been seen.
+        """
+        
+        descendants = select(Category.id).where(
+            Category.parent_id == category_id
+        ).cte("descendants", recursive=True)
+        descendants = descendants.union(
+            select(Category.id).join(descendants, Category.parent_id == descendants.c.id)
+        )
+        
+        return tuple(db.execute(select(descendants.c.id)).scalars())
     
     @staticmethod
     def invalidate_cache():
-        """Invalidate category tree cache"""
-        cache.delete("category_tree")
\ No newline at end of file
+        """
+        Invalidate category tree cache and the in-process path/descendants
+        lookups; every category write must call this (CategoryService does)
+        """
+        redis_cache.delete_cached_data("category_tree")
+        _path_cache.clear()
+        _descendants_cache.clear()
\ No newline at end of file
@@ -0,0 +1,24 @@
+import base64
+import binascii
+from fastapi import HTTPException, status
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen row ID into an opaque pagination cursor"""
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decode an opaque pagination cursor back into the last seen row ID
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
@@ -0,0 +1,49 @@
+from functools import lru_cache
+from typing import Any
+import orjson
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _get_adapter(schema: Any) -> TypeAdapter:
+    """Build (once) the TypeAdapter for a response schema"""
+    return TypeAdapter(schema)
+
+
+def json_response(schema: Any, data: Any) -> Response:
+    """
+    Validate data against a response schema and return it as JSON bytes
+
+    Uses a cached TypeAdapter so hot list endpoints skip FastAPI's generic
+    response_model handling. Keep response_model on the route for the docs.
+
+    Args:
+        schema: Response schema (a Pydantic model or type)
+        data: Data to validate, ORM objects are read by attribute
+
+    Returns:
+        JSON response
+    """
+    adapter = _get_adapter(schema)
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(data, from_attributes=True)),
+        media_type="application/json"
+    )
+
+
+def raw_json_response(payload: Any) -> Response:
+    """
+    Return an already serialized (JSON-mode) payload as JSON bytes
+
+    Use this for payloads that were validated when they were built, such as
+    cached responses, so they are not validated a second time.
+
+    Args:
+        payload: JSON-compatible data, or JSON bytes sent as-is
+
+    Returns:
+        JSON response
+    """
+    content = payload if isinstance(payload, bytes) else orjson.dumps(payload)
+    return Response(content=content, media_type="application/json")
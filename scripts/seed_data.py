@@ -1,14 +1,17 @@
 """
 Database seeder script for creating admin user and sample data
 """
+import csv
+import io
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import insert
 from app.database import SessionLocal, engine, Base
 from app.models.user import User
 from app.models.category import Category
-from app.models.product import Product
+from app.models.product import Product, ProductStatus
 from app.core.security import get_password_hash
 from app.config import settings
 
@@ -57,27 +60,66 @@ def seed_categories(db):
         print("✓ Categories already exist")
         return
     
-    # Root categories
-    electronics = Category(name="Electronics", slug="electronics", description="Electronic devices and accessories")
-    clothing = Category(name="Clothing", slug="clothing", description="Apparel and fashion")
-    books = Category(name="Books", slug="books", description="Books and publications")
+    # Root categories, inserted in one statement that returns their IDs
+    roots = [
+        {"name": "Electronics", "slug": "electronics", "description": "Electronic devices and accessories"},
+        {"name": "Clothing", "slug": "clothing", "description": "Apparel and fashion"},
+        {"name": "Books", "slug": "books", "description": "Books and publications"},
+    ]
+    root_ids = dict(
+        db.execute(insert(Category).returning(Category.slug, Category.id), roots).all()
+    )
+    electronics_id = root_ids["electronics"]
+    clothing_id = root_ids["clothing"]
     
-    db.add_all([electronics, clothing, books])
+    subcategories = [
+        # Electronics subcategories
+        {"name": "Smartphones", "slug": "smartphones", "description": "Mobile phones", "parent_id": electronics_id},
+        {"name": "Laptops", "slug": "laptops", "description": "Portable computers", "parent_id": electronics_id},
+        {"name": "Accessories", "slug": "accessories", "description": "Electronic accessories", "parent_id": electronics_id},
+        
+        # Clothing subcategories
+        {"name": "Men's Wear", "slug": "mens-wear", "description": "Men's clothing", "parent_id": clothing_id},
+        {"name": "Women's Wear", "slug": "womens-wear", "description": "Women's clothing", "parent_id": clothing_id},
+    ]
+    db.execute(insert(Category), subcategories)
     db.commit()
     
-    # Electronics subcategories
-    smartphones = Category(name="Smartphones", slug="smartphones", description="Mobile phones", parent_id=electronics.id)
-    laptops = Category(name="Laptops", slug="laptops", description="Portable computers", parent_id=electronics.id)
-    accessories = Category(name="Accessories", slug="accessories", description="Electronic accessories", parent_id=electronics.id)
-    
-    # Clothing subcategories
-    mens = Category(name="Men's Wear", slug="mens-wear", description="Men's clothing", parent_id=clothing.id)
-    womens = Category(name="Women's Wear", slug="womens-wear", description="Women's clothing", parent_id=clothing.id)
+    print(f"✓ Created {db.query(Category).count()} categories")
+
+
+_PRODUCT_COPY_COLUMNS = ("name", "sku", "description", "price", "stock", "status", "category_id")
+
+
+def _copy_products(db, rows):
+    """
+    Bulk load products with PostgreSQL COPY (psycopg2), which skips
+    per-row statement parsing; other databases use a multi-row INSERT.
+    Either way the rows are written in the session's transaction.
+    """
+    if db.get_bind().dialect.driver != "psycopg2":
+        db.execute(insert(Product), rows)
+        return
     
-    db.add_all([smartphones, laptops, accessories, mens, womens])
-    db.commit()
+    # CSV keeps quoting/escaping correct; None is written as an unquoted
+    # empty field, which COPY reads as NULL
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = dict(row)
+        # Enum columns store member names
+        values["status"] = ProductStatus(values["status"]).name
+        writer.writerow([values.get(column) for column in _PRODUCT_COPY_COLUMNS])
+    buffer.seek(0)
     
-    print(f"✓ Created {db.query(Category).count()} categories")
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY products ({', '.join(_PRODUCT_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
 
 
 def seed_products(db):
@@ -89,86 +131,88 @@ def seed_products(db):
         print("✓ Products already exist")
         return
     
-    # Get categories
-    smartphones_cat = db.query(Category).filter(Category.slug == "smartphones").first()
-    laptops_cat = db.query(Category).filter(Category.slug == "laptops").first()
+    # Get categories (slug -> id) in one query
+    category_ids = dict(
+        db.query(Category.slug, Category.id).filter(Category.slug.in_(["smartphones", "laptops"])).all()
+    )
     
     products = [
-        Product(
-            name="iPhone 15 Pro",
-            sku="IPHONE-15-PRO",
-            description="Latest iPhone with A17 Pro chip",
-            price=999.99,
-            stock=50,
-            status="active",
-            category_id=smartphones_cat.id if smartphones_cat else None
-        ),
-        Product(
-            name="Samsung Galaxy S24",
-            sku="GALAXY-S24",
-            description="Flagship Samsung smartphone",
-            price=899.99,
-            stock=40,
-            status="active",
-            category_id=smartphones_cat.id if smartphones_cat else None
-        ),
-        Product(
-            name="MacBook Pro 14\"",
-            sku="MBP-14-M3",
-            description="MacBook Pro with M3 chip",
-            price=1999.99,
-            stock=30,
-            status="active",
-            category_id=laptops_cat.id if laptops_cat else None
-        ),
-        Product(
-            name="Dell XPS 15",
-            sku="DELL-XPS-15",
-            description="Premium Windows laptop",
-            price=1599.99,
-            stock=25,
-            status="active",
-            category_id=laptops_cat.id if laptops_cat else None
-        ),
-        Product(
-            name="AirPods Pro",
-            sku="AIRPODS-PRO",
-            description="Wireless earbuds with ANC",
-            price=249.99,
-            stock=100,
-            status="active",
-            category_id=None
-        ),
-        Product(
-            name="Magic Mouse",
-            sku="MAGIC-MOUSE",
-            description="Apple wireless mouse",
-            price=79.99,
-            stock=75,
-            status="active",
-            category_id=None
-        ),
-        Product(
-            name="USB-C Cable",
-            sku="USB-C-CABLE",
-            description="High-speed USB-C charging cable",
-            price=19.99,
-            stock=200,
-            status="active",
-            category_id=None
-        ),
-        Product(
-            name="Wireless Charger",
-            sku="WIRELESS-CHARGER",
-            description="Qi wireless charging pad",
-            price=39.99,
-            stock=150,
-            status="active",
-            category_id=None
-        )
+        {
+            "name": "iPhone 15 Pro",
+            "sku": "IPHONE-15-PRO",
+            "description": "Latest iPhone with A17 Pro chip",
+            "price": 999.99,
+            "stock": 50,
+            "status": "active",
+            "category_id": category_ids.get("smartphones")
+        },
+        {
+            "name": "Samsung Galaxy S24",
+            "sku": "GALAXY-S24",
+            "description": "Flagship Samsung smartphone",
+            "price": 899.99,
+            "stock": 40,
+            "status": "active",
+            "category_id": category_ids.get("smartphones")
+        },
+        {
+            "name": "MacBook Pro 14\"",
+            "sku": "MBP-14-M3",
+            "description": "MacBook Pro with M3 chip",
+            "price": 1999.99,
+            "stock": 30,
+            "status": "active",
+            "category_id": category_ids.get("laptops")
+        },
+        {
+            "name": "Dell XPS 15",
+            "sku": "DELL-XPS-15",
+            "description": "Premium Windows laptop",
+            "price": 1599.99,
+            "stock": 25,
+            "status": "active",
+            "category_id": category_ids.get("laptops")
+        },
+        {
+            "name": "AirPods Pro",
+            "sku": "AIRPODS-PRO",
+            "description": "Wireless earbuds with ANC",
+            "price": 249.99,
+            "stock": 100,
+            "status": "active",
+            "category_id": None
+        },
+        {
+            "name": "Magic Mouse",
+            "sku": "MAGIC-MOUSE",
+            "description": "Apple wireless mouse",
+            "price": 79.99,
+            "stock": 75,
+            "status": "active",
+            "category_id": None
+        },
+        {
+            "name": "USB-C Cable",
+            "sku": "USB-C-CABLE",
+            "description": "High-speed USB-C charging cable",
+            "price": 19.99,
+            "stock": 200,
+            "status": "active",
+            "category_id": None
+        },
+        {
+            "name": "Wireless Charger",
+            "sku": "WIRELESS-CHARGER",
+            "description": "Qi wireless charging pad",
+            "price": 39.99,
+            "stock": 150,
+            "status": "active",
+            "category_id": None
+        }
     ]
     
-    db.add_all(products)
+    # One bulk load instead of a unit-of-work flush per product
+    _copy_products(db, products)
     db.commit()
     
     print(f"✓ Created {len(products)} sample products")